@@ -1,23 +1,29 @@
 import streamlit as st
 import tableauserverclient as TSC
+from tableau_session import get_tableau_sessions
+
+# Signed-in Tableau servers reused across reruns of this browser session
+tableau_sessions = get_tableau_sessions(st.session_state)
 
 # Function to refresh the extract for a data source
 def refresh_data_source_extract(data_source_id):
     try:
         # Tableau authentication using Personal Access Token (PAT)
         tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site_id=site_id)
-        server = TSC.Server(server_url, use_server_version=True)
 
-        # Connect to Tableau Server/Online
-        with server.auth.sign_in(tableau_auth):
+        def refresh(server):
             # Fetch the data source by ID
             data_source = server.datasources.get_by_id(data_source_id)
-            
+
             # Trigger the extract refresh
             server.datasources.refresh(data_source)
+            return data_source
 
-            # Inform the user
-            st.success(f"Extract refresh triggered successfully for Data Source: {data_source.name}")
+        # Reuses this session's sign-in when there is one
+        data_source = tableau_sessions.run(server_url, site_id, tableau_auth, refresh)
+
+        # Inform the user
+        st.success(f"Extract refresh triggered successfully for Data Source: {data_source.name}")
     
     except Exception as e:
         st.error(f"An error occurred while refreshing the data source extract: {e}")
@@ -40,3 +46,6 @@ if st.button("Refresh Data Source Extract"):
         refresh_data_source_extract(data_source_id)
     else:
         st.error("Please enter a valid Data Source ID.")
+
+with st.sidebar.expander("Tableau sign-ins"):
+    st.write(tableau_sessions.stats())
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
+from entry_import import REQUIRED_COLUMNS, import_entries
+from entry_store import STATUSES, EntryCache, EntryStore
 
 # Configure the page
 st.set_page_config(
@@ -9,22 +11,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Excel file path
-EXCEL_FILE = "data_entries.xlsx"
+# Entries live in an append-only SQLite store; data_entries.xlsx is exported on demand
+@st.cache_resource
+def get_entry_store():
+    return EntryStore()
 
-def load_data():
-    """Load existing data from Excel or create new DataFrame"""
-    try:
-        return pd.read_excel(EXCEL_FILE)
-    except FileNotFoundError:
-        return pd.DataFrame(columns=[
-            "Date", "Customer Name", "Product Name", 
-            "Quantity", "Unit Price", "Total Price", "Status"
-        ])
+entry_store = get_entry_store()
 
-def save_data(df):
-    """Save DataFrame to Excel file"""
-    df.to_excel(EXCEL_FILE, index=False)
+# Pages and totals stay in memory until the store's files change on disk
+@st.cache_resource
+def get_entry_cache():
+    return EntryCache(entry_store)
+
+entry_cache = get_entry_cache()
 
 # Main app interface
 st.title("📝 Data Entry Application")
@@ -42,7 +41,7 @@ with st.form("data_form"):
         quantity = st.number_input("Quantity", min_value=1, value=1)
         unit_price = st.number_input("Unit Price ($)", min_value=0.0, value=0.0)
         total_price = quantity * unit_price
-        status = st.selectbox("Status", options=["Delivered", "Pending", "Cancelled"])
+        status = st.selectbox("Status", options=STATUSES)
     
     st.markdown(f"**Total Price:** ${total_price:,.2f}")
     
@@ -52,7 +51,7 @@ with st.form("data_form"):
         if not customer_name or not product_name:
             st.error("Please fill in all required fields (Customer Name and Product Name)")
         else:
-            new_entry = pd.DataFrame([{
+            new_entry = {
                 "Date": entry_date,
                 "Customer Name": customer_name,
                 "Product Name": product_name,
@@ -60,25 +59,94 @@ with st.form("data_form"):
                 "Unit Price": unit_price,
                 "Total Price": total_price,
                 "Status": status
-            }])
-            
-            df = load_data()
-            df = pd.concat([df, new_entry], ignore_index=True)
-            save_data(df)
+            }
+            entry_store.append(new_entry)
             st.success("Entry saved successfully!")
 
+# Bulk import: validated in chunks, valid rows committed together
+with st.expander("📥 Bulk Import (CSV / XLSX)"):
+    st.caption("Columns: " + ", ".join(REQUIRED_COLUMNS)
+               + ". Total Price is calculated from Quantity and Unit Price.")
+    upload = st.file_uploader("Transactions file", type=["csv", "xlsx"])
+    if upload is not None and st.button("Import"):
+        try:
+            with st.spinner("Importing..."):
+                result = import_entries(entry_store, upload, upload.name)
+        except Exception as e:
+            st.error(f"Import failed, nothing was saved: {e}")
+        else:
+            st.success(f"Imported {result['imported']:,} of {result['rows_read']:,} rows "
+                       f"in {result['elapsed_seconds']:.1f}s")
+            if result["rejected"]:
+                st.warning(f"{result['rejected']:,} rows were rejected")
+                st.dataframe(result["rejected_rows"].head(100), use_container_width=True, hide_index=True)
+                st.download_button("Download rejected rows", result["rejected_rows"].to_csv(index=False),
+                                   file_name="rejected_rows.csv")
+
+def entry_filters():
+    filter_cols = st.columns(4)
+    entry_dates = filter_cols[0].date_input("Entry dates", value=())
+    customer = filter_cols[1].text_input("Customer contains")
+    products = filter_cols[2].multiselect("Product", aggregates["products"]["Product Name"].tolist())
+    statuses = filter_cols[3].multiselect("Status", STATUSES)
+    date_from, date_to = entry_dates if len(entry_dates) == 2 else (None, None)
+    return dict(date_from=date_from, date_to=date_to, customer=customer,
+                products=tuple(products), statuses=tuple(statuses))
+
+def show_entries_page(page_size, filters):
+    # Stack of id cursors, one per page visited; reset whenever the filters change
+    page_key = (page_size, tuple(filters.items()))
+    if st.session_state.get("entry_page_key") != page_key:
+        st.session_state["entry_page_key"] = page_key
+        st.session_state["entry_cursors"] = [None]
+    cursors = st.session_state["entry_cursors"]
+
+    page, has_more = entry_cache.query("page", before_id=cursors[-1], page_size=page_size, **filters)
+    st.caption(f"Page {len(cursors)}")
+    if page.empty:
+        st.info("No entries match these filters.")
+    else:
+        st.dataframe(
+            page.style.format({
+                "Unit Price": "${:.2f}",
+                "Total Price": "${:.2f}"
+            }),
+            use_container_width=True
+        )
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("Previous page", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next page", disabled=not has_more):
+        cursors.append(int(page.index[-1]))
+        st.rerun()
+
 # Display existing data
 st.header("📋 Saved Entries")
-df = load_data()
-
-if not df.empty:
-    st.dataframe(
-        df.style.format({
-            "Unit Price": "${:.2f}",
-            "Total Price": "${:.2f}"
-        }),
-        use_container_width=True
-    )
-    st.markdown(f"**Total Records:** {len(df)}")
+# Running totals are maintained by the store as entries are saved
+aggregates = entry_cache.query("aggregates")
+
+if aggregates["total_entries"]:
+    metric_cols = st.columns(1 + len(aggregates["statuses"]))
+    metric_cols[0].metric("Total Revenue", f"${aggregates['total_revenue']:,.2f}")
+    for metric_col, (entry_status, entries) in zip(metric_cols[1:], aggregates["statuses"].items()):
+        metric_col.metric(entry_status, entries)
+    with st.expander("Quantity per product"):
+        st.dataframe(aggregates["products"], use_container_width=True, hide_index=True)
+
+    page_size = st.selectbox("Entries per page", (25, 50, 100, 250), index=1)
+    show_entries_page(page_size, entry_filters())
+    st.markdown(f"**Total Records:** {aggregates['total_entries']}")
+
+    # Compacted Excel copy of the store, written only when asked for
+    if st.button("Export to Excel"):
+        export_path = entry_store.export_excel()
+        with open(export_path, "rb") as f:
+            st.download_button("Download data_entries.xlsx", f.read(), file_name="data_entries.xlsx")
 else:
-    st.info("No entries found. Start adding data using the form above.")
\ No newline at end of file
+    st.info("No entries found. Start adding data using the form above.")
+
+# Cache behaviour for troubleshooting slow pages
+with st.sidebar.expander("Debug: saved entries cache"):
+    st.write(entry_cache.stats())
@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
-from snowflake.snowpark import Session
-from snowflake.snowpark.functions import col, when_matched
+import time as time_module
+from datetime import datetime, time, timedelta
+from snowflake_session import get_session_manager
+from fruit_catalog import FruitCatalog, load_fruit_options
+from ingredient_demand import DemandCache, count_pending_ingredients
+from pending_orders import PendingOrderBoard, apply_fill_changes, changed_fill_status, fetch_pending_page
 
 # Snowflake connection parameters
 sf_options = {
@@ -13,50 +17,176 @@ sf_options = {
     "schema": "PUBLIC"
 }
 
-# Create the Snowflake session manually
-try:
-    session = Session.builder.configs(sf_options).create()
-except Exception as e:
-    st.error(f"Error creating Snowflake session: {e}")
-    session = None  # Set session to None if creation fails
+# Shared Snowflake session pool: reruns and other tablets reuse the same logins
+session_manager = get_session_manager(sf_options)
+
+# Pending orders are kept in memory and refreshed incrementally for every screen
+@st.cache_resource
+def get_pending_board():
+    return PendingOrderBoard(min_poll_interval=2.0)
+
+board = get_pending_board()
+
+def load_catalog():
+    with session_manager.lease() as session:
+        return load_fruit_options(session)
+
+# Known fruit names, used to tokenize INGREDIENTS for the stock prep list
+@st.cache_resource
+def get_fruit_catalog():
+    return FruitCatalog(load_catalog, ttl_seconds=600)
+
+@st.cache_resource
+def get_demand_cache():
+    return DemandCache(bucket_seconds=300)
+
+fruit_catalog = get_fruit_catalog()
+demand_cache = get_demand_cache()
 
 # Write directly to the app
 st.title(":cup_with_straw: Pending Smoothie Orders :cup_with_straw:")
 st.write("Orders that need to be filled.")
 
-# Ensure session was created successfully before proceeding
-if session:
+# "Live board" keeps every pending order in memory; "Paged" fetches one page at a time from Snowflake
+view_mode = st.sidebar.radio("View", ("Live board", "Paged"))
+
+# Kitchen screen refresh settings
+auto_refresh = st.sidebar.toggle("Auto-refresh", value=True)
+refresh_seconds = st.sidebar.number_input("Refresh every (seconds)", min_value=5, max_value=600, value=30)
+
+def edit_orders(session, my_dataframe, refresh_board=True):
+    # Display the DataFrame in the data editor; only ORDER_FILLED is editable
+    editable_df = st.data_editor(
+        my_dataframe,
+        disabled=[column for column in my_dataframe.columns if column != "ORDER_FILLED"]
+    )
+    submitted = st.button('Submit')
+
+    if submitted:
+        try:
+            # Send only the orders whose ORDER_FILLED was actually changed
+            changes = changed_fill_status(my_dataframe, editable_df)
+            rows_updated = apply_fill_changes(session, changes)
+
+            if refresh_board:
+                board.poll(session, force=True)
+            if rows_updated < len(changes):
+                st.warning(
+                    f"{len(changes) - rows_updated} order(s) were changed from another screen and were left as they are."
+                )
+            st.success(f"{rows_updated} order(s) updated!", icon="👍")
+        except Exception as e:
+            st.error(f"Error during update: {e}")
+
+def show_pending_orders(session):
     try:
-        # Retrieve data as a Snowpark DataFrame, filter by pending orders
-        my_dataframe = session.table("smoothies.public.orders").filter(col("ORDER_FILLED") == 0).to_pandas()
+        # Fetch only what changed since the last poll, then read the in-memory pending set
+        board.poll(session)
+        my_dataframe = board.snapshot()
 
         # Check if there are any pending orders
         if not my_dataframe.empty:
-            # Display the DataFrame in the data editor
-            editable_df = st.data_editor(my_dataframe)
-            submitted = st.button('Submit')
-
-            if submitted:
-                try:
-                    # Convert the edited pandas DataFrame back to a Snowpark DataFrame
-                    edited_dataset = session.create_dataframe(editable_df)
-
-                    # Perform the merge operation to update the orders in Snowflake
-                    og_dataset = session.table("smoothies.public.orders")
-
-                    # Merge operation on ORDER_UID and update ORDER_FILLED
-                    og_dataset.merge(
-                        edited_dataset,
-                        (og_dataset['ORDER_UID'] == edited_dataset['ORDER_UID']),
-                        [when_matched().update({'ORDER_FILLED': edited_dataset['ORDER_FILLED']})]
-                    )
-
-                    st.success("Order(s) Updated!", icon="👍")
-                except Exception as e:
-                    st.error(f"Error during update: {e}")
+            edit_orders(session, my_dataframe)
         else:
             st.success("There are no pending orders right now.", icon="👍")
     except Exception as e:
         st.error(f"Error retrieving data: {e}")
-else:
-    st.error("Could not establish a Snowflake session.")
+
+def show_stock_prep(session, recent_hours, page=None):
+    # In Paged mode the pending counts cover the page on screen, so the board is never loaded
+    started = time_module.perf_counter()
+    fruit_names = fruit_catalog.names()
+    fruit_ids = [fruit_catalog.fruit_id(name) for name in fruit_names]
+    if page is None:
+        board.poll(session)
+        board_version, pending_orders = board.versioned_snapshot()
+        pending = demand_cache.pending(pending_orders, fruit_names, board_version, fruit_ids)
+        recent = demand_cache.recent(session, fruit_names, board.watermark_uid, recent_hours, fruit_ids)
+    else:
+        pending = count_pending_ingredients(page, fruit_names, fruit_ids)
+        recent = demand_cache.recent(session, fruit_names, None, recent_hours, fruit_ids)
+    elapsed_ms = (time_module.perf_counter() - started) * 1000
+
+    prep_df = pd.DataFrame({"Pending orders": pending, f"Last {recent_hours}h": recent})
+    if page is not None:
+        prep_df = prep_df.rename(columns={"Pending orders": "Pending orders (this page)"})
+    prep_df = prep_df[(prep_df != 0).any(axis=1)].sort_values(prep_df.columns[0], ascending=False)
+    st.dataframe(prep_df, use_container_width=True)
+    st.caption(f"Computed in {elapsed_ms:.0f} ms")
+
+def paging_filters():
+    page_size = st.sidebar.selectbox("Orders per page", (25, 50, 100, 250), index=1)
+    name_prefix = st.sidebar.text_input("Name on order starts with")
+    order_dates = st.sidebar.date_input("Ordered between", value=())
+    ts_from = ts_to = None
+    if len(order_dates) == 2:
+        ts_from = datetime.combine(order_dates[0], time.min)
+        ts_to = datetime.combine(order_dates[1], time.min) + timedelta(days=1)
+    return page_size, name_prefix, ts_from, ts_to
+
+def show_pending_page(session, page_size, name_prefix, ts_from, ts_to):
+    # Stack of ORDER_UID cursors, one per page visited; reset whenever the filters change
+    filters = (page_size, name_prefix, ts_from, ts_to)
+    if st.session_state.get("page_filters") != filters:
+        st.session_state["page_filters"] = filters
+        st.session_state["page_cursors"] = [None]
+    cursors = st.session_state["page_cursors"]
+
+    try:
+        page, has_more = fetch_pending_page(
+            session, after_uid=cursors[-1], page_size=page_size,
+            ts_from=ts_from, ts_to=ts_to, name_prefix=name_prefix
+        )
+    except Exception as e:
+        st.error(f"Error retrieving data: {e}")
+        return None
+
+    st.caption(f"Page {len(cursors)}")
+    if not page.empty:
+        edit_orders(session, page, refresh_board=False)
+    else:
+        st.success("There are no pending orders right now.", icon="👍")
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("Previous page", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next page", disabled=not has_more):
+        cursors.append(int(page["ORDER_UID"].iloc[-1]))
+        st.rerun()
+    return page
+
+if view_mode == "Paged":
+    page_args = paging_filters()
+
+@st.fragment(run_every=refresh_seconds if auto_refresh else None)
+def pending_orders_fragment():
+    try:
+        with session_manager.lease() as session:
+            page = None
+            if view_mode == "Paged":
+                page = show_pending_page(session, *page_args)
+            else:
+                show_pending_orders(session)
+
+            if view_mode != "Paged" or page is not None:
+                with st.expander("Stock prep list"):
+                    recent_hours = st.number_input("Recent window (hours)", min_value=1, max_value=168, value=24)
+                    show_stock_prep(session, recent_hours, page)
+    except Exception as e:
+        st.error(f"Error creating Snowflake session: {e}")
+
+pending_orders_fragment()
+
+# The in-memory board only exists for the Live board view
+if view_mode == "Live board":
+    if st.sidebar.button("Full reload"):
+        with session_manager.lease() as session:
+            board.reload(session)
+        st.rerun()
+
+    with st.sidebar.expander("Pending board"):
+        st.write(board.stats())
+
+with st.sidebar.expander("Snowflake sessions"):
+    st.write(session_manager.stats())
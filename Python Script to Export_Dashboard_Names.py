@@ -1,6 +1,12 @@
+import argparse
 import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import tableauserverclient as TSC
 
+from tableau_inventory import fetch_all
+
 # Define connection parameters
 server_url = 'https://your-tableau-server.com'  # Tableau server URL
 site = ''  # Default site is empty; specify the site name if you're using one
@@ -15,47 +21,109 @@ password = 'your_password'  # Your Tableau password
 # Uncomment the next 3 lines and comment out the username/password section to use PAT
 token_name = 'your_token_name'  # The name of your personal access token
 token_value = 'your_token_value'  # The value of your personal access token
-tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site=site)
+tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site_id=site)
 
 # Create a server object and authenticate
 server = TSC.Server(server_url, use_server_version=True)
 
-# Function to export dashboard, data source, and user information to CSV
-def export_dashboard_data_to_csv(csv_file_path):
-    # Open CSV file for writing
-    with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
-        fieldnames = ['Dashboard Name', 'Data Source Name', 'User Name']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        
-        # Write header to CSV
-        writer.writeheader()
-
-        with server.auth.sign_in(tableau_auth):
-            # Get all workbooks (dashboards) from Tableau Server
-            all_workbooks, pagination_item = server.workbooks.get()
-            
-            for workbook in all_workbooks:
-                # Get datasources for the workbook
-                datasources, _ = server.workbooks.populate_connections(workbook)
-
-                # Get all users on Tableau Server
-                users, _ = server.users.get()
-
-                # Write the dashboard, data source, and user information
-                for datasource in datasources:
-                    for user in users:
-                        # Write a row for each combination of dashboard, data source, and user
-                        writer.writerow({
-                            'Dashboard Name': workbook.name,
-                            'Data Source Name': datasource.name,
-                            'User Name': user.name
-                        })
-                        print(f"Writing: {workbook.name}, {datasource.name}, {user.name}")
-
-    print(f"Export complete! Data saved to {csv_file_path}")
-
-# Define path to save the CSV file
-csv_file_path = 'tableau_export.csv'  # Replace with your desired CSV file path
-
-# Call the function to export data
-export_dashboard_data_to_csv(csv_file_path)
+FIELDNAMES = ['Dashboard Name', 'Data Source Name', 'User Name']
+
+# Rows buffered before each write to the output file
+CHUNK_ROWS = 10_000
+
+# Concurrent populate_connections calls
+MAX_WORKERS = 8
+
+
+def workbook_connections(workbooks, max_workers=MAX_WORKERS):
+    """(workbook, data source names) for each workbook; connections are fetched in parallel"""
+    def populate(workbook):
+        server.workbooks.populate_connections(workbook)
+        return workbook, [connection.datasource_name for connection in workbook.connections]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="populate-connections") as pool:
+        yield from pool.map(populate, workbooks)
+
+
+def export_rows(mapping, max_workers=MAX_WORKERS):
+    """Yield (dashboard, data source, user) rows; must run inside a signed-in session.
+
+    mapping "all-users" reproduces the original export: every data source of
+    every workbook paired with every user on the site. "owner" pairs each
+    data source with the workbook owner only.
+    """
+    # Users are listed once, every page, instead of once per workbook
+    users = fetch_all(server.users)
+    user_names = [user.name for user in users]
+    owner_names = {user.id: user.name for user in users}
+
+    for workbook, datasource_names in workbook_connections(fetch_all(server.workbooks), max_workers):
+        for datasource_name in datasource_names:
+            if mapping == "owner":
+                yield workbook.name, datasource_name, owner_names.get(workbook.owner_id, "")
+            else:
+                for user_name in user_names:
+                    yield workbook.name, datasource_name, user_name
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_csv(chunks, path):
+    with open(path, mode='w', newline='', encoding='utf-8', buffering=1 << 20) as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDNAMES)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            yield len(chunk)
+
+
+def write_parquet(chunks, path):
+    # Optional dependency, only needed for --format parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.string()) for name in FIELDNAMES])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_arrays([pa.array(column) for column in zip(*chunk)], schema=schema))
+            yield len(chunk)
+
+
+# Function to export dashboard, data source, and user information
+def export_dashboard_data(path, file_format="csv", mapping="all-users", chunk_rows=CHUNK_ROWS,
+                          max_workers=MAX_WORKERS):
+    write = write_parquet if file_format == "parquet" else write_csv
+    started = time.perf_counter()
+    written = 0
+    with server.auth.sign_in(tableau_auth):
+        for count in write(chunked(export_rows(mapping, max_workers), chunk_rows), path):
+            written += count
+            elapsed = time.perf_counter() - started
+            print(f"\r{written:,} rows ({written / elapsed:,.0f} rows/s)", end="", flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"\nExport complete! {written:,} rows saved to {path} in {elapsed:.1f}s "
+          f"({written / elapsed if elapsed else 0:,.0f} rows/s)")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export dashboard / data source / user rows from Tableau")
+    parser.add_argument("--output", default="tableau_export.csv")  # Replace with your desired file path
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--mapping", choices=("all-users", "owner"), default="all-users",
+                        help="pair each data source with every site user (original export) or the workbook owner")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    export_dashboard_data(args.output, args.format, args.mapping, args.chunk_rows, args.workers)
@@ -1,5 +1,6 @@
 import streamlit as st
 import tableauserverclient as TSC
+from tableau_session import get_tableau_sessions, is_auth_failure
 import logging
 from datetime import time
 
@@ -50,6 +51,9 @@ def create_schedule(server, tableau_auth, schedule_type, interval_value, start_t
         st.success(f"{schedule_type} schedule created (ID: {created_schedule.id}).")
 
     except Exception as e:
+        if is_auth_failure(e):
+            # Let the session cache sign in again and retry
+            raise
         st.error(f"Error creating {schedule_type} schedule: {str(e)}")
 
 
@@ -57,6 +61,9 @@ def main():
     # Set up Streamlit UI
     st.title("Tableau Schedule Creator")
 
+    # Signed-in Tableau servers reused across reruns of this browser session
+    tableau_sessions = get_tableau_sessions(st.session_state)
+
     # Authentication method selection
     auth_method = st.radio("Select Authentication Method", ["Personal Access Token (PAT)", "Username/Password"])
 
@@ -98,18 +105,20 @@ def main():
                 else:
                     raise ValueError("Please provide the required authentication credentials.")
                 
-                # Connect to Tableau Server
-                server = TSC.Server(server_url, use_server_version=False)
-                server.add_http_options({"verify": False})
-                server.use_server_version()
-
-                with server.auth.sign_in(tableau_auth):
-                    create_schedule(server, tableau_auth, schedule_type, interval_value, start_time, end_time, days)
+                # Connect to Tableau Server, reusing this session's sign-in when there is one
+                tableau_sessions.run(
+                    server_url, site_id, tableau_auth,
+                    lambda server: create_schedule(server, tableau_auth, schedule_type, interval_value, start_time, end_time, days),
+                    http_options={"verify": False},
+                )
             except Exception as e:
                 st.error(f"Authentication error: {str(e)}")
         else:
             st.error("Please provide all required Tableau credentials (Server URL, Site ID, and Authentication details).")
 
+    with st.sidebar.expander("Tableau sign-ins"):
+        st.write(tableau_sessions.stats())
+
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,7 @@
+import pandas as pd
 import streamlit as st
 import tableauserverclient as TSC
+from tableau_inventory import fetch_inventory
 
 # Set up connection.
 tableau_auth = TSC.PersonalAccessTokenAuth(
@@ -18,17 +20,12 @@ server = TSC.Server(st.secrets["tableau"]["server_url"], use_server_version=True
 # server = TSC.Server('https://prod-apnortheast-a.online.tableau.com')
 
 with server.auth.sign_in(tableau_auth):
-    all_users, pagination_item = server.users.get()
-    st.write(f"\nThere are {pagination_item.total_available} users on site:")
-    st.write([user.name for user in all_users])
+    # Every page of every listing, fetched concurrently
+    inventory, timings = fetch_inventory(server)
+    st.dataframe(timings, hide_index=True)
 
-    all_datasources, pagination_item_ds = server.datasources.get()
-    all_workbooks_items, pagination_item_wb = server.workbooks.get()
-
-    st.write(f"\nThere are {pagination_item_ds.total_available} datasources on site:")
-    st.write([datasource.name for datasource in all_datasources])
-    st.write([datasource.id for datasource in all_datasources])
-
-    st.write(f"\nThere are {pagination_item_wb.total_available} workbooks on site:")
-    st.write([workbook.name for workbook in all_workbooks_items])
-    st.write([workbook.id for workbook in all_workbooks_items])
+    # One table per listing instead of one element per item name
+    for name, items in inventory.items():
+        st.write(f"\nThere are {len(items)} {name} on site:")
+        st.dataframe(pd.DataFrame([(item.id, item.name) for item in items], columns=["ID", "Name"]),
+                     hide_index=True)
@@ -2,6 +2,7 @@ import streamlit as st
 import tableauserverclient as TSC
 import pandas as pd
 import io
+from tableau_inventory import fetch_by_ids, fetch_inventory
 
 # Streamlit UI for user credentials input
 st.title("Tableau Dashboard with Personal Access Token (PAT)")
@@ -24,34 +25,37 @@ def fetch_all_content():
 
         # Connect to Tableau Server/Online
         with server.auth.sign_in(tableau_auth):
-            # Fetch workbooks
-            all_workbooks, _ = server.workbooks.get()
-
-            # Fetch datasources
-            all_datasources, _ = server.datasources.get()
-
-            # Fetch projects
-            all_projects, _ = server.projects.get()
-
-            # Fetch views
-            all_views, _ = server.views.get()
-
-            # Create an empty list to hold views and their associated workbooks
-            views_data = []
-            for view in all_views:
-                # Get the workbook ID for this view
-                workbook_id = view.workbook.id if hasattr(view, 'workbook') else None
-                workbook_name = "Unknown"
-                workbook_project = "Unknown"
-                
-                if workbook_id:
-                    # Fetch the workbook by ID to get the name and project
-                    workbook = server.workbooks.get_by_id(workbook_id)
-                    workbook_name = workbook.name
-                    workbook_project = workbook.project_name
-                
-                # Append view information along with its workbook info
-                views_data.append((view.id, view.name, workbook_name, workbook_project))
+            # Page through workbooks, datasources, projects and views concurrently
+            inventory, timings = fetch_inventory(server, endpoints=("workbooks", "datasources", "projects", "views"))
+            all_workbooks = inventory["workbooks"]
+            all_datasources = inventory["datasources"]
+            all_projects = inventory["projects"]
+            all_views = inventory["views"]
+
+            # A failed listing comes back empty; say so instead of showing an empty table
+            failed = timings[timings["Error"].notna()]
+            for listing in failed.itertuples():
+                st.warning(f"Could not list {listing.Endpoint}: {listing.Error}")
+
+            # Index the workbooks we already have by ID; look up any the listing missed
+            # (e.g. published while we were paging) in batches instead of once per view.
+            # Without a workbooks listing every view would be "missing", so skip the lookup then.
+            workbooks_by_id = {workbook.id: workbook for workbook in all_workbooks}
+            missing_ids = {view.workbook_id for view in all_views if view.workbook_id} - workbooks_by_id.keys()
+            if missing_ids and "workbooks" not in set(failed["Endpoint"]):
+                for workbook in fetch_by_ids(server.workbooks, missing_ids):
+                    workbooks_by_id[workbook.id] = workbook
+
+            # Join each view to its workbook's name and project through the index
+            workbook_index = pd.DataFrame(
+                [(workbook.id, workbook.name, workbook.project_name) for workbook in workbooks_by_id.values()],
+                columns=["Workbook ID", "Workbook", "Project"]
+            )
+            views_df = pd.DataFrame(
+                [(view.id, view.name, view.workbook_id) for view in all_views],
+                columns=["ID", "Name", "Workbook ID"]
+            ).merge(workbook_index, on="Workbook ID", how="left")
+            views_df = views_df[["ID", "Name", "Workbook", "Project"]].fillna({"Workbook": "Unknown", "Project": "Unknown"})
 
             # Combine all content into a dictionary to display
             workbooks_data = [(workbook.id, workbook.name, workbook.project_name, workbook.size) for workbook in all_workbooks]
@@ -62,21 +66,23 @@ def fetch_all_content():
             workbooks_df = pd.DataFrame(workbooks_data, columns=["ID", "Name", "Project", "Size"])
             datasources_df = pd.DataFrame(datasources_data, columns=["ID", "Name", "Project", "Size"])
             projects_df = pd.DataFrame(projects_data, columns=["ID", "Name"])
-            views_df = pd.DataFrame(views_data, columns=["ID", "Name", "Workbook", "Project"])
 
-            return workbooks_df, datasources_df, projects_df, views_df
+            return workbooks_df, datasources_df, projects_df, views_df, timings
 
     except Exception as e:
         st.error(f"An error occurred while retrieving content: {e}")
-        return None, None, None, None
+        return None, None, None, None, None
 
 # If the user selects "Content Info"
 if option == "Content Info":
     if st.button("Connect to Tableau and Fetch Content Info"):
         if token_name and token_value and server_url:
-            workbooks_df, datasources_df, projects_df, views_df = fetch_all_content()
+            workbooks_df, datasources_df, projects_df, views_df, timings = fetch_all_content()
 
             if workbooks_df is not None:
+                with st.expander("Fetch timing per endpoint"):
+                    st.dataframe(timings, hide_index=True)
+
                 st.write(f"There are {workbooks_df.shape[0]} workbooks on the server:")
                 st.dataframe(workbooks_df)  # Display workbooks in a table
                 st.download_button(
@@ -1,7 +1,10 @@
 import streamlit as st
 import tableauserverclient as TSC
+from tableau_catalog import ContentCatalog, site_key
+from tableau_export import EXPORT_FORMATS, download_args
+from tableau_session import get_tableau_sessions
 import pandas as pd
-from io import BytesIO
+from datetime import datetime
 import logging
 import os
 from datetime import time
@@ -17,84 +20,69 @@ token_value = st.text_input("Enter your Tableau Personal Access Token Value", ty
 site_id = st.text_input("Enter your Tableau Site ID (Leave blank for default site)", value="")
 server_url = st.text_input("Enter Tableau Server URL", value="https://prod-apnortheast-a.online.tableau.com")
 
+# Signed-in Tableau servers reused across reruns and actions of this browser session
+tableau_sessions = get_tableau_sessions(st.session_state)
+with st.sidebar.expander("Tableau sign-ins"):
+    st.write(tableau_sessions.stats())
+
 # Radio button to switch between create project, content info, publish workbook, and create group
 option = st.radio("Select an option:", ("Content Info", "Create Project", "Publish Workbook", "Create Group"))
 
 # If the user selects "Content Info"
 if option == "Content Info":
+    # Content Info renders from the local catalog of the user this browser session signed in as;
+    # connecting only syncs what changed
+    full_resync = st.checkbox("Full resync (also removes items deleted on the server)")
+
     # Button to trigger the connection
     if st.button("Connect to Tableau"):
         if token_name and token_value and server_url:
             try:
                 # Tableau authentication using Personal Access Token (PAT)
                 tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site_id=site_id)
-                server = TSC.Server(server_url, use_server_version=True)
-
-                # Connect to Tableau Server/Online
-                with server.auth.sign_in(tableau_auth):
-                    # Get the list of users
-                    all_users, pagination_item = server.users.get()
-
-                    # Get the list of datasources
-                    all_datasources, pagination_item_ds = server.datasources.get()
-
-                    # Get the list of workbooks
-                    all_workbooks_items, pagination_item_wb = server.workbooks.get()
-
-                    # Combine all the data into one DataFrame for users
-                    users_df = pd.DataFrame([(user.id, user.name) for user in all_users], columns=["ID", "Name"])
-                    users_df["Type"] = "User"  # Add a 'Type' column indicating that this data is about users
-
-                    # Combine all the data into one DataFrame for datasources
-                    datasources_df = pd.DataFrame([(datasource.id, datasource.name) for datasource in all_datasources], columns=["ID", "Name"])
-                    datasources_df["Type"] = "Datasource"  # Add a 'Type' column indicating that this data is about datasources
-
-                    # Combine all the data into one DataFrame for workbooks
-                    workbooks_df = pd.DataFrame([(workbook.id, workbook.name) for workbook in all_workbooks_items], columns=["ID", "Name"])
-                    workbooks_df["Type"] = "Workbook"  # Add a 'Type' column indicating that this data is about workbooks
-
-                    # Concatenate all data into one DataFrame
-                    combined_df = pd.concat([users_df, datasources_df, workbooks_df], ignore_index=True)
-
-                    # Display the combined DataFrame in a table format
-                    st.write(f"There are {combined_df.shape[0]} total entries:")
-                    st.dataframe(combined_df)  # Display the combined table in Streamlit app
-
-                    # Function to convert DataFrame to Excel
-                    def to_excel(df):
-                        # Create a BytesIO object and write the DataFrame to it as an Excel file
-                        output = BytesIO()
-                        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                            df.to_excel(writer, index=False, sheet_name="Tableau Data")
-                        output.seek(0)  # Rewind the buffer to the beginning
-                        return output
-
-                    # Add a radio button to let users choose the export format
-                    export_option = st.radio("Choose export format:", ("Excel", "CSV"))
-
-                    # Based on the selected export option, prepare the file for download
-                    if export_option == "Excel":
-                        excel_file = to_excel(combined_df)
-                        st.download_button(
-                            label="Download Excel file",
-                            data=excel_file,
-                            file_name="tableau_data.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                    elif export_option == "CSV":
-                        csv_data = combined_df.to_csv(index=False)
-                        st.download_button(
-                            label="Download CSV file",
-                            data=csv_data,
-                            file_name="tableau_data.csv",
-                            mime="text/csv"
-                        )
+
+                def sync(server):
+                    catalog = ContentCatalog(site_key(server_url, site_id, server.user_id))
+                    return catalog.site, catalog.sync(server, force_full=full_resync)
+
+                # Reuses this session's sign-in when there is one
+                catalog_key, sync_report = tableau_sessions.run(server_url, site_id, tableau_auth, sync)
+                st.session_state["content_catalog"] = {"site": (server_url, site_id), "key": catalog_key}
+
+                with st.expander("Sync timing per endpoint"):
+                    st.dataframe(sync_report, hide_index=True)
+                for failed in sync_report[sync_report["Error"].notna()].itertuples():
+                    st.warning(f"Could not list {failed.Endpoint}: {failed.Error}")
 
             except Exception as e:
                 st.error(f"An error occurred while connecting to Tableau: {e}")
         else:
             st.error("Please provide all the necessary credentials.")
 
+    # Nothing is shown until this browser session has signed in to the site
+    signed_in = st.session_state.get("content_catalog")
+    if signed_in is None or signed_in["site"] != (server_url, site_id):
+        st.info("Use Connect to Tableau to sign in and show this site's content.")
+    else:
+        catalog = ContentCatalog(signed_in["key"])
+        last_sync = catalog.last_sync()
+        if last_sync:
+            combined_df = catalog.frame()
+            st.caption(f"Catalog last synced {datetime.fromtimestamp(last_sync):%Y-%m-%d %H:%M:%S}")
+
+            # Display the combined DataFrame in a table format
+            st.write(f"There are {combined_df.shape[0]} total entries:")
+            st.dataframe(combined_df)  # Display the combined table in Streamlit app
+
+            # Add a radio button to let users choose the export format
+            export_option = st.radio("Choose export format:", tuple(EXPORT_FORMATS))
+
+            # The file is streamed from the catalog into a temporary file when the button is clicked
+            st.download_button(
+                label=f"Download {export_option} file",
+                **download_args(export_option, list(combined_df.columns), catalog.iter_rows),
+            )
+
 # If the user selects "Create Project"
 elif option == "Create Project":
     # Ask for project name and description if the user selects "Create Project"
@@ -107,9 +95,8 @@ elif option == "Create Project":
             try:
                 # Tableau authentication using Personal Access Token (PAT)
                 tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site_id=site_id)
-                server = TSC.Server(server_url, use_server_version=True)
-                
-                with server.auth.sign_in(tableau_auth):
+
+                def create_project(server):
                     # Create a new project on Tableau Server
                     top_level_project = TSC.ProjectItem(
                         name=project_name,
@@ -122,6 +109,9 @@ elif option == "Create Project":
                     created_project = server.projects.create(top_level_project)
                     st.success(f"Project '{created_project.name}' created successfully!")
 
+                # Reuses this session's sign-in when there is one
+                tableau_sessions.run(server_url, site_id, tableau_auth, create_project)
+
             except Exception as e:
                 st.error(f"An error occurred while creating the project: {e}")
         else:
@@ -141,9 +131,8 @@ elif option == "Publish Workbook":
             try:
                 # Tableau authentication using Personal Access Token (PAT)
                 tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site_id=site_id)
-                server = TSC.Server(server_url, use_server_version=True)
-                
-                with server.auth.sign_in(tableau_auth):
+
+                def publish_workbook(server):
                     # Retrieve project ID by name
                     req_options = TSC.RequestOptions()
                     req_options.filter.add(
@@ -188,6 +177,10 @@ elif option == "Publish Workbook":
                     )
 
                     st.success(f"Workbook '{new_workbook.name}' published successfully!")
+
+                # Reuses this session's sign-in when there is one
+                tableau_sessions.run(server_url, site_id, tableau_auth, publish_workbook)
+
             except Exception as e:
                 st.error(f"An error occurred while publishing the workbook: {e}")
         else:
@@ -207,9 +200,8 @@ elif option == "Create Group":
             try:
                 # Tableau authentication using Personal Access Token (PAT)
                 tableau_auth = TSC.PersonalAccessTokenAuth(token_name, token_value, site_id=site_id)
-                server = TSC.Server(server_url, use_server_version=True)
-                
-                with server.auth.sign_in(tableau_auth):
+
+                def create_group(server):
                     # Create a new group
                     group = TSC.GroupItem(group_name)
                     try:
@@ -243,6 +235,10 @@ elif option == "Create Group":
                                     raise serverError
 
                     st.success(f"Group '{group_name}' created successfully!")
+
+                # Reuses this session's sign-in when there is one
+                tableau_sessions.run(server_url, site_id, tableau_auth, create_group)
+
             except Exception as e:
                 st.error(f"An error occurred while creating the group: {e}")
         else:
@@ -0,0 +1,87 @@
+import argparse
+import json
+import tomllib
+
+import pandas as pd
+
+from fruit_catalog import load_fruit_options
+from ingredient_codec import ORDERS_TABLE, ingredient_mask
+from ingredient_demand import fruit_pattern
+from smoothie_backend import col, lit, parse_json, when_matched
+from snowflake_session import get_session_manager
+
+
+def build_mapping(session, fruit_df):
+    """INGREDIENTS string -> (INGREDIENT_IDS JSON, INGREDIENT_MASK) for every row not yet encoded.
+
+    Orders repeat the same few fruit combinations, so each distinct string is
+    tokenized once. Strings containing text that is not a known fruit are
+    returned separately and left alone.
+    """
+    ids_by_name = dict(zip(fruit_df["FRUIT_NAME"], fruit_df["FRUIT_ID"].astype(int)))
+    pattern = fruit_pattern(ids_by_name)
+
+    distinct = session.table(ORDERS_TABLE).filter(
+        col("INGREDIENT_IDS").is_null() & col("INGREDIENTS").is_not_null()
+    ).select(col("INGREDIENTS")).distinct().to_pandas()
+
+    rows, unknown = [], []
+    for ingredients in distinct["INGREDIENTS"]:
+        names = pattern.findall(ingredients)
+        if pattern.sub("", ingredients).strip():
+            unknown.append(ingredients)
+            continue
+        fruit_ids = [ids_by_name[name] for name in names]
+        rows.append((ingredients, json.dumps(fruit_ids), ingredient_mask(fruit_ids)))
+    mapping = pd.DataFrame(rows, columns=["INGREDIENTS", "INGREDIENT_IDS_JSON", "INGREDIENT_MASK"])
+    return mapping, unknown
+
+
+def backfill(session, mapping):
+    """Set INGREDIENT_IDS/INGREDIENT_MASK on historical rows with one MERGE; returns rows updated"""
+    if mapping.empty:
+        return 0
+    source = session.create_dataframe(mapping)
+    target = session.table(ORDERS_TABLE)
+    result = target.merge(
+        source,
+        (target["INGREDIENTS"] == source["INGREDIENTS"]) & target["INGREDIENT_IDS"].is_null(),
+        [when_matched().update({
+            "INGREDIENT_IDS": parse_json(source["INGREDIENT_IDS_JSON"]),
+            "INGREDIENT_MASK": source["INGREDIENT_MASK"],
+        })],
+    )
+    return result.rows_updated
+
+
+def clear_ingredient_text(session):
+    """Drop the INGREDIENTS text from encoded rows; orders_decoded rebuilds it"""
+    result = session.table(ORDERS_TABLE).update(
+        {"INGREDIENTS": lit(None)}, col("INGREDIENT_IDS").is_not_null()
+    )
+    return result.rows_updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill FRUIT_ID-encoded ingredients for historical orders")
+    parser.add_argument("--secrets", default=".streamlit/secrets.toml",
+                        help="TOML file with a [connections.snowflake] section")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be encoded")
+    parser.add_argument("--clear-text", action="store_true",
+                        help="also NULL the INGREDIENTS text of encoded rows (needs the ORDERS_DECODED view)")
+    args = parser.parse_args()
+
+    with open(args.secrets, "rb") as f:
+        sf_options = tomllib.load(f)["connections"]["snowflake"]
+
+    session_manager = get_session_manager(sf_options)
+    with session_manager.lease() as session:
+        mapping, unknown = build_mapping(session, load_fruit_options(session))
+        print(f"{len(mapping)} distinct ingredient combinations to encode")
+        for ingredients in unknown:
+            print(f"Skipping, not all fruits are in FRUIT_OPTIONS: {ingredients!r}")
+
+        if not args.dry_run:
+            print(f"Encoded {backfill(session, mapping)} order(s)")
+            if args.clear_text:
+                print(f"Cleared INGREDIENTS text on {clear_ingredient_text(session)} order(s)")
@@ -0,0 +1,138 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from entry_store import COLUMNS, STATUSES, EntryStore
+
+# Rows validated (and held in memory) at a time
+CHUNK_ROWS = 50_000
+
+# Rejected rows kept for the report; the rest are only counted
+MAX_REPORTED_REJECTS = 10_000
+
+# Total Price is optional in the file; it is always recomputed
+REQUIRED_COLUMNS = [column for column in COLUMNS if column != "Total Price"]
+
+
+def iter_chunks(source, filename, chunk_rows=CHUNK_ROWS):
+    """DataFrames of at most chunk_rows rows from a CSV or XLSX file (path or file object)"""
+    if filename.lower().endswith(".csv"):
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+        return
+
+    # read_excel has no chunksize; openpyxl's read-only mode streams the sheet row by row
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def validate_chunk(chunk, first_row):
+    """Split a raw chunk into (valid entries, rejected rows with a Reason column).
+
+    Every rule is a whole-column operation. first_row is the spreadsheet row
+    number of the chunk's first row, used in the rejection report.
+    """
+    chunk = chunk.rename(columns=lambda column: str(column).strip())
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    chunk = chunk.reset_index(drop=True)
+
+    text = {column: chunk[column].astype("string").str.strip()
+            for column in ("Customer Name", "Product Name", "Status")}
+    entries = pd.DataFrame({
+        "Date": pd.to_datetime(chunk["Date"], errors="coerce"),
+        "Customer Name": text["Customer Name"],
+        "Product Name": text["Product Name"],
+        "Quantity": pd.to_numeric(chunk["Quantity"], errors="coerce"),
+        "Unit Price": pd.to_numeric(chunk["Unit Price"], errors="coerce"),
+        "Status": text["Status"],
+    })
+
+    rules = [
+        (entries["Date"].isna(), "invalid Date"),
+        (entries["Customer Name"].fillna("").eq(""), "missing Customer Name"),
+        (entries["Product Name"].fillna("").eq(""), "missing Product Name"),
+        (entries["Quantity"].isna() | (entries["Quantity"] % 1 != 0) | (entries["Quantity"] < 1),
+         "Quantity must be a whole number of at least 1"),
+        (entries["Unit Price"].isna() | (entries["Unit Price"] < 0), "Unit Price must be a number >= 0"),
+        (~entries["Status"].isin(STATUSES), f"Status must be one of {', '.join(STATUSES)}"),
+    ]
+    reasons = pd.Series("", index=chunk.index)
+    for failed, reason in rules:
+        failed = failed.fillna(True).astype(bool)
+        reasons = reasons.mask(failed, reasons + reason + "; ")
+    rejected_mask = reasons != ""
+
+    valid = entries[~rejected_mask].copy()
+    valid["Quantity"] = valid["Quantity"].astype("int64")
+    valid["Total Price"] = valid["Quantity"] * valid["Unit Price"]
+
+    rejected = chunk[rejected_mask].copy()
+    rejected.insert(0, "Row", rejected.index + first_row)
+    rejected["Reason"] = reasons[rejected_mask].str.rstrip("; ")
+    return valid[list(COLUMNS)], rejected
+
+
+def import_entries(store, source, filename, chunk_rows=CHUNK_ROWS):
+    """Validate a CSV/XLSX file chunk by chunk and add the valid rows in one batch.
+
+    Returns a dict with the row counts, the rejected rows (up to
+    MAX_REPORTED_REJECTS) and the elapsed time. Nothing is added if the file
+    cannot be read or lacks a required column.
+    """
+    started = time.perf_counter()
+    totals = {"rows_read": 0, "rejected": 0}
+    rejected_rows = []
+
+    def valid_chunks():
+        # Spreadsheet row 1 is the header
+        first_row = 2
+        for chunk in iter_chunks(source, filename, chunk_rows):
+            valid, rejected = validate_chunk(chunk, first_row)
+            first_row += len(chunk)
+            totals["rows_read"] += len(chunk)
+            totals["rejected"] += len(rejected)
+            reported = sum(len(frame) for frame in rejected_rows)
+            if reported < MAX_REPORTED_REJECTS:
+                rejected_rows.append(rejected.head(MAX_REPORTED_REJECTS - reported))
+            yield valid
+
+    imported = store.bulk_append(valid_chunks())
+    return {
+        "rows_read": totals["rows_read"],
+        "imported": imported,
+        "rejected": totals["rejected"],
+        "rejected_rows": pd.concat(rejected_rows, ignore_index=True) if rejected_rows else pd.DataFrame(),
+        "elapsed_seconds": time.perf_counter() - started,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import transactions into the data entry store")
+    parser.add_argument("file", help="CSV or XLSX file with the Data Entry columns")
+    parser.add_argument("--db", default="data_entries.db")
+    parser.add_argument("--rejects", default="rejected_rows.csv", help="where to write rejected rows")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    result = import_entries(EntryStore(args.db), args.file, os.path.basename(args.file), args.chunk_rows)
+    print(f"Read {result['rows_read']} rows: imported {result['imported']}, rejected {result['rejected']} "
+          f"in {result['elapsed_seconds']:.1f}s")
+    if result["rejected"]:
+        result["rejected_rows"].to_csv(args.rejects, index=False)
+        print(f"Rejected rows written to {args.rejects}")
@@ -0,0 +1,414 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+
+# Primary store; data_entries.xlsx is now an export generated from it
+DB_FILE = "data_entries.db"
+EXCEL_FILE = "data_entries.xlsx"
+
+# How long a writer waits for another writer's transaction before giving up
+BUSY_TIMEOUT_SECONDS = 30
+
+# Upper bound on pages/aggregates EntryCache keeps between two changes to the store
+MAX_MEMOIZED_QUERIES = 128
+
+# Allowed values of the Status column
+STATUSES = ("Delivered", "Pending", "Cancelled")
+
+# Column shown in the app / Excel -> column in the entries table
+COLUMNS = {
+    "Date": "entry_date",
+    "Customer Name": "customer_name",
+    "Product Name": "product_name",
+    "Quantity": "quantity",
+    "Unit Price": "unit_price",
+    "Total Price": "total_price",
+    "Status": "status",
+}
+
+SCHEMA = """
+create table if not exists entries (
+    id integer primary key autoincrement,
+    entry_date text not null,
+    customer_name text not null,
+    product_name text not null,
+    quantity integer not null,
+    unit_price real not null,
+    total_price real not null,
+    status text not null,
+    created_at text not null default (datetime('now'))
+);
+create table if not exists store_meta (
+    key text primary key,
+    value text not null
+);
+create index if not exists entries_date on entries (entry_date);
+create index if not exists entries_customer on entries (customer_name);
+create index if not exists entries_product on entries (product_name);
+create index if not exists entries_status on entries (status);
+
+-- Running aggregates, kept up to date by the trigger below in the same transaction as each insert
+create table if not exists product_totals (
+    product_name text primary key,
+    quantity integer not null,
+    revenue real not null
+);
+create table if not exists status_counts (
+    status text primary key,
+    entries integer not null
+);
+create trigger if not exists entries_aggregate after insert on entries
+begin
+    insert into product_totals (product_name, quantity, revenue)
+        values (new.product_name, new.quantity, new.total_price)
+        on conflict (product_name) do update
+        set quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;
+    insert into status_counts (status, entries)
+        values (new.status, 1)
+        on conflict (status) do update set entries = entries + 1;
+end;
+"""
+
+# Rebuilds the aggregates from scratch for stores created before they existed
+REBUILD_AGGREGATES = """
+delete from product_totals;
+delete from status_counts;
+insert into product_totals (product_name, quantity, revenue)
+    select product_name, sum(quantity), sum(total_price) from entries group by product_name;
+insert into status_counts (status, entries)
+    select status, count(*) from entries group by status;
+insert or replace into store_meta (key, value) values ('aggregates', 'trigger');
+"""
+
+
+def _date_text(value):
+    """ISO date string for a date, datetime, Timestamp or date-like string"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return pd.Timestamp(value).date().isoformat()
+
+
+def entry_row(entry):
+    """Tuple in COLUMNS order for a dict keyed by display column names"""
+    return (
+        _date_text(entry["Date"]),
+        str(entry["Customer Name"]),
+        str(entry["Product Name"]),
+        int(entry["Quantity"]),
+        float(entry["Unit Price"]),
+        float(entry["Total Price"]),
+        str(entry["Status"]),
+    )
+
+
+class EntryStore:
+    """Append-only SQLite store for the data entry app.
+
+    Saving an entry is a single-row INSERT, so its cost no longer depends on
+    how many entries exist. The Excel workbook is written from the store only
+    when an export is requested. An existing data_entries.xlsx with no store
+    next to it is imported the first time the store is opened.
+    """
+
+    def __init__(self, path=DB_FILE, excel_path=EXCEL_FILE):
+        self.path = path
+        self.excel_path = excel_path
+        with closing(self._connect()) as conn:
+            # Write-ahead log: a save interrupted by a crash is rolled back on the next open,
+            # and readers keep working while a save is in progress
+            conn.execute("pragma journal_mode = wal")
+            conn.executescript(SCHEMA)
+        self._backfill_aggregates()
+        self.migrated = self.migrate_excel()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.execute("pragma synchronous = full")
+        return conn
+
+    @contextmanager
+    def _write(self):
+        # BEGIN IMMEDIATE takes SQLite's write lock up front, so concurrent saves from
+        # any thread or process queue up (for up to BUSY_TIMEOUT_SECONDS) instead of
+        # failing or overwriting each other
+        with closing(self._connect()) as conn:
+            conn.execute("begin immediate")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("rollback")
+                raise
+            conn.execute("commit")
+
+    @contextmanager
+    def _read(self):
+        with closing(self._connect()) as conn:
+            yield conn
+
+    def _insert_sql(self):
+        columns = ", ".join(COLUMNS.values())
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        return f"insert into entries ({columns}) values ({placeholders})"
+
+    def _backfill_aggregates(self):
+        with self._write() as conn:
+            if conn.execute("select 1 from store_meta where key = 'aggregates'").fetchone():
+                return
+            for statement in REBUILD_AGGREGATES.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+
+    @staticmethod
+    def _mark_migrated(conn, note):
+        conn.execute(
+            "insert or ignore into store_meta (key, value) values ('excel_migrated', ?)",
+            (f"{note} at {datetime.now().isoformat(timespec='seconds')}",),
+        )
+
+    def migrate_excel(self):
+        """Import a legacy data_entries.xlsx once; returns the number of rows imported.
+
+        Only the first open of a store looks for the workbook, so a later export
+        (written from the store itself) is never imported back.
+        """
+        with self._write() as conn:
+            if conn.execute("select value from store_meta where key = 'excel_migrated'").fetchone():
+                return 0
+            if not self.excel_path or not os.path.exists(self.excel_path):
+                self._mark_migrated(conn, "no legacy workbook")
+                return 0
+            legacy = pd.read_excel(self.excel_path)
+            rows = [entry_row(entry) for entry in legacy.to_dict("records")]
+            conn.executemany(self._insert_sql(), rows)
+            self._mark_migrated(conn, f"{len(rows)} rows from {self.excel_path}")
+            return len(rows)
+
+    def append(self, entry):
+        """Add one entry (dict keyed by display column names); returns its id"""
+        row = entry_row(entry)
+        with self._write() as conn:
+            return conn.execute(self._insert_sql(), row).lastrowid
+
+    def bulk_append(self, chunks):
+        """Add every entry from an iterable of DataFrames in one transaction; returns the count.
+
+        Chunks (display column names, already validated) are staged in a
+        connection-private temp table first, so the write lock is only held for
+        the final INSERT ... SELECT and other operators can keep saving while a
+        large file is being read.
+        """
+        columns = ", ".join(COLUMNS.values())
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with closing(self._connect()) as conn:
+            conn.execute(f"create temp table staged_entries as select {columns} from entries where 0")
+            staged = 0
+            for chunk in chunks:
+                rows = chunk[list(COLUMNS)].copy()
+                rows["Date"] = pd.to_datetime(rows["Date"]).dt.strftime("%Y-%m-%d")
+                conn.execute("begin")
+                conn.executemany(f"insert into staged_entries values ({placeholders})",
+                                 rows.itertuples(index=False, name=None))
+                conn.execute("commit")
+                staged += len(rows)
+
+            conn.execute("begin immediate")
+            try:
+                conn.execute(f"insert into entries ({columns}) select {columns} from staged_entries order by rowid")
+            except BaseException:
+                conn.execute("rollback")
+                raise
+            conn.execute("commit")
+        return staged
+
+    def count(self):
+        with self._read() as conn:
+            return conn.execute("select count(*) from entries").fetchone()[0]
+
+    def load_since(self, after_id=0):
+        """Entries with id > after_id, indexed by id, with the display column names"""
+        select = ", ".join(f'{column} as "{label}"' for label, column in COLUMNS.items())
+        with self._read() as conn:
+            df = pd.read_sql_query(
+                f"select id, {select} from entries where id > ? order by id", conn,
+                params=(after_id,), index_col="id",
+            )
+        df["Date"] = pd.to_datetime(df["Date"])
+        return df
+
+    def load(self):
+        """Every entry as a DataFrame with the display column names, oldest first"""
+        return self.load_since(0).reset_index(drop=True)
+
+    def page(self, before_id=None, page_size=50, date_from=None, date_to=None,
+             customer=None, products=(), statuses=()):
+        """One page of entries, newest first, keyset-paginated on id.
+
+        Returns (page, has_more). Pass the smallest id of a page as before_id to
+        get the next one. Filters and LIMIT run in SQLite against indexed
+        columns, so only page_size rows are read into pandas.
+        """
+        where, params = [], []
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(int(before_id))
+        if date_from is not None:
+            where.append("entry_date >= ?")
+            params.append(_date_text(date_from))
+        if date_to is not None:
+            where.append("entry_date <= ?")
+            params.append(_date_text(date_to))
+        if customer:
+            where.append("customer_name like ? escape '\\'")
+            escaped = customer.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        for column, values in (("product_name", products), ("status", statuses)):
+            if values:
+                where.append(f"{column} in ({', '.join('?' for _ in values)})")
+                params.extend(values)
+
+        select = ", ".join(f'{column} as "{label}"' for label, column in COLUMNS.items())
+        sql = f"select id, {select} from entries"
+        if where:
+            sql += " where " + " and ".join(where)
+        # One extra row tells us whether another page follows
+        sql += " order by id desc limit ?"
+        params.append(page_size + 1)
+
+        with self._read() as conn:
+            page = pd.read_sql_query(sql, conn, params=params, index_col="id")
+        page["Date"] = pd.to_datetime(page["Date"])
+        return page.head(page_size), len(page) > page_size
+
+    def aggregates(self):
+        """Running totals: revenue, quantity and revenue per product, entries per status"""
+        with self._read() as conn:
+            products = pd.read_sql_query(
+                'select product_name as "Product Name", quantity as "Quantity", revenue as "Revenue" '
+                "from product_totals order by revenue desc", conn,
+            )
+            statuses = dict(conn.execute("select status, entries from status_counts order by status"))
+        return {
+            "total_revenue": float(products["Revenue"].sum()),
+            "total_entries": sum(statuses.values()),
+            "products": products,
+            "statuses": statuses,
+        }
+
+    def export_excel(self, path=None):
+        """Write the whole store to an Excel workbook (replacing it) and return its path.
+
+        The workbook is written to a private temporary file and renamed over the
+        old one, so readers only ever see a complete export even when several
+        exports run at once.
+        """
+        path = path or self.excel_path
+        with self._write() as conn:
+            # Stores opened before the marker was always written: never import this export
+            self._mark_migrated(conn, "store exported before migration was recorded")
+        df = self.load()
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        try:
+            df.to_excel(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return path
+
+
+class EntryCache:
+    """Pages and aggregates read from the store, reused until the database files change.
+
+    Results are keyed on the query and its arguments, and dropped whenever the
+    modification time or size of the database or its write-ahead log changes,
+    i.e. after any save from any process.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        # Pages and aggregates read since the files last changed, keyed by query
+        self._queries = {}
+        self._queries_signature = None
+        self.hits = 0
+        self.misses = 0
+        self.last_load_ms = None
+        self.last_result = None
+
+    def signature(self):
+        """(mtime, size) of the database and its WAL file"""
+        signature = []
+        for path in (self.store.path, self.store.path + "-wal"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def query(self, name, **kwargs):
+        """Memoized store.page()/store.aggregates() result, dropped when the files change"""
+        # Take the signature before reading so a save during the read is picked up next time
+        signature = self.signature()
+        key = (name, tuple(sorted((k, tuple(v) if isinstance(v, (list, tuple)) else v)
+                                  for k, v in kwargs.items())))
+        with self._lock:
+            if signature != self._queries_signature:
+                self._queries = {}
+                self._queries_signature = signature
+            if key in self._queries:
+                self.hits += 1
+                self.last_result = "hit"
+                return self._queries[key]
+
+        started = time.perf_counter()
+        result = getattr(self.store, name)(**kwargs)
+        with self._lock:
+            if signature == self._queries_signature:
+                if len(self._queries) >= MAX_MEMOIZED_QUERIES:
+                    self._queries = {}
+                self._queries[key] = result
+            self.misses += 1
+            self.last_load_ms = (time.perf_counter() - started) * 1000
+            self.last_result = f"{name} query"
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self._queries = {}
+            self._queries_signature = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memoized_queries": len(self._queries),
+                "last_result": self.last_result,
+                "hits": self.hits,
+                "misses": self.misses,
+                "last_load_ms": self.last_load_ms,
+            }
+
+
+if __name__ == "__main__":
+    # e.g. from cron: python entry_store.py --export
+    parser = argparse.ArgumentParser(description="Data entry store maintenance")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--export", metavar="XLSX", nargs="?", const=EXCEL_FILE,
+                        help="write the compacted Excel export")
+    args = parser.parse_args()
+
+    store = EntryStore(args.db)
+    if store.migrated:
+        print(f"Imported {store.migrated} entries from {store.excel_path}")
+    if args.export:
+        print(f"Exported {store.count()} entries to {store.export_excel(args.export)}")
+    else:
+        print(f"{store.count()} entries in {store.path}")
@@ -0,0 +1,82 @@
+import threading
+import time
+
+from smoothie_backend import col
+
+# Table holding the fruits a customer can pick from
+FRUIT_OPTIONS_TABLE = "smoothies.public.fruit_options"
+
+
+def load_fruit_options(session):
+    """Read FRUIT_OPTIONS once and return it as a pandas DataFrame"""
+    return session.table(FRUIT_OPTIONS_TABLE).select(
+        col("FRUIT_ID"), col("FRUIT_NAME"), col("SEARCH_ON")
+    ).to_pandas()
+
+
+class FruitCatalog:
+    """Process-wide, TTL-cached index of FRUIT_OPTIONS.
+
+    The loader is only called when the cache is empty, expired or has been
+    invalidated; every other lookup is served from memory.
+    """
+
+    def __init__(self, loader, ttl_seconds=600):
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._names = []
+        self._index = None
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _build_index(self, fruit_df):
+        # FRUIT_NAME -> (SEARCH_ON, FRUIT_ID), in FRUIT_ID order for the multiselect
+        fruit_df = fruit_df.sort_values("FRUIT_ID")
+        names = fruit_df["FRUIT_NAME"].tolist()
+        index = dict(zip(names, zip(fruit_df["SEARCH_ON"].tolist(), fruit_df["FRUIT_ID"].tolist())))
+        return names, index
+
+    def _current(self):
+        with self._lock:
+            expired = time.monotonic() - self._loaded_at > self.ttl_seconds
+            if self._index is None or expired:
+                self.misses += 1
+                self._names, self._index = self._build_index(self._loader())
+                self._loaded_at = time.monotonic()
+            else:
+                self.hits += 1
+            return self._names, self._index
+
+    def names(self):
+        """All fruit names, in FRUIT_ID order"""
+        names, _ = self._current()
+        return list(names)
+
+    def lookup(self, fruit_name):
+        """Return (SEARCH_ON, FRUIT_ID) for a fruit, or (None, None) if unknown"""
+        _, index = self._current()
+        return index.get(fruit_name, (None, None))
+
+    def search_on(self, fruit_name):
+        return self.lookup(fruit_name)[0]
+
+    def fruit_id(self, fruit_name):
+        return self.lookup(fruit_name)[1]
+
+    def invalidate(self):
+        """Drop the cached index so the next lookup reloads FRUIT_OPTIONS"""
+        with self._lock:
+            self._index = None
+            self._names = []
+
+    def stats(self):
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._index is not None else None
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "fruits": len(self._names),
+                "age_seconds": age,
+            }
@@ -0,0 +1,73 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from smoothie_backend import bitand, col, lit
+
+# "text" keeps the space-joined INGREDIENTS column; "ids" stores FRUIT_IDs instead
+ENCODING_ENV = "SMOOTHIES_INGREDIENT_ENCODING"
+
+# View that rebuilds INGREDIENTS from INGREDIENT_IDS (see "File for Table Creation.txt")
+ORDERS_TABLE = "smoothies.public.orders"
+ORDERS_DECODED_VIEW = "smoothies.public.orders_decoded"
+
+# FRUIT_ID n is stored as bit n of INGREDIENT_MASK; pandas/NumPy read it as int64
+MAX_MASK_FRUIT_ID = 62
+
+
+def encoding_enabled():
+    return os.environ.get(ENCODING_ENV, "text").lower() == "ids"
+
+
+def orders_source():
+    """Table or view that readers should query for orders"""
+    return ORDERS_DECODED_VIEW if encoding_enabled() else ORDERS_TABLE
+
+
+def ingredient_mask(fruit_ids):
+    """Bitmask with bit FRUIT_ID set for every chosen fruit"""
+    mask = 0
+    for fruit_id in fruit_ids:
+        if not 0 <= fruit_id <= MAX_MASK_FRUIT_ID:
+            raise ValueError(f"FRUIT_ID {fruit_id} does not fit in INGREDIENT_MASK")
+        mask |= 1 << fruit_id
+    return mask
+
+
+def encode_ingredients(fruit_names, fruit_catalog):
+    """(INGREDIENT_IDS as a JSON array, INGREDIENT_MASK) for fruits in the order chosen.
+
+    Raises ValueError if a fruit is not in FRUIT_OPTIONS (any more).
+    """
+    unknown = [name for name in fruit_names if fruit_catalog.fruit_id(name) is None]
+    if unknown:
+        raise ValueError(f"Not on the fruit list any more: {', '.join(unknown)}")
+    fruit_ids = [int(fruit_catalog.fruit_id(name)) for name in fruit_names]
+    return json.dumps(fruit_ids), ingredient_mask(fruit_ids)
+
+
+def decode_ingredients(fruit_ids, names_by_id):
+    """Rebuild the legacy space-joined INGREDIENTS string from FRUIT_IDs"""
+    return "".join(names_by_id[fruit_id] + " " for fruit_id in fruit_ids)
+
+
+def contains_fruit(fruit_id):
+    """Snowpark predicate: the order contains this FRUIT_ID (integer test, no LIKE scan)"""
+    return bitand(col("INGREDIENT_MASK"), lit(1 << fruit_id)) != 0
+
+
+def count_by_mask(masks, fruit_ids):
+    """Per-fruit counts over an array of INGREDIENT_MASK values"""
+    masks = np.asarray(masks, dtype=np.int64)
+    bits = np.asarray(fruit_ids, dtype=np.int64)
+    # (orders x fruits) bit test, summed down each column
+    return ((masks[:, None] >> bits[None, :]) & 1).sum(axis=0)
+
+
+def mask_column(orders):
+    """INGREDIENT_MASK as int64 with missing masks as 0, or None if the column is absent"""
+    if "INGREDIENT_MASK" not in orders:
+        return None
+    return pd.to_numeric(orders["INGREDIENT_MASK"], errors="coerce").fillna(0).astype("int64")
@@ -0,0 +1,111 @@
+import re
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+from ingredient_codec import contains_fruit, count_by_mask, encoding_enabled, mask_column
+from smoothie_backend import col, concat, contains, current_timestamp, dateadd, iff, lit
+from smoothie_backend import sum as sum_
+
+# Orders table in Snowflake (see "File for Table Creation.txt")
+ORDERS_TABLE = "smoothies.public.orders"
+
+
+def fruit_pattern(fruit_names):
+    """Regex matching whole fruit names inside a space-joined INGREDIENTS string.
+
+    Longer names are tried first so "Dragon Fruit" is never read as a shorter
+    name that happens to be a prefix of it.
+    """
+    names = sorted(set(fruit_names), key=len, reverse=True)
+    return re.compile(r"(?<!\S)(?:" + "|".join(re.escape(name) for name in names) + r")(?!\S)")
+
+
+def count_ingredients(ingredients, fruit_names):
+    """Per-fruit counts over a Series of INGREDIENTS strings, as a Series indexed by fruit name"""
+    if ingredients.empty:
+        return pd.Series(0, index=list(fruit_names), dtype="int64")
+    # One regex pass over the joined column instead of one per order
+    joined = ingredients.dropna().str.cat(sep="  ")
+    counts = Counter(fruit_pattern(fruit_names).findall(joined))
+    return pd.Series([counts.get(name, 0) for name in fruit_names], index=list(fruit_names), dtype="int64")
+
+
+def count_pending_ingredients(orders, fruit_names, fruit_ids=None):
+    """Per-fruit counts over in-memory orders.
+
+    Orders carrying an INGREDIENT_MASK are counted with integer bit tests;
+    the rest fall back to tokenizing their INGREDIENTS text.
+    """
+    masks = mask_column(orders)
+    if masks is None or fruit_ids is None:
+        return count_ingredients(orders.get("INGREDIENTS", pd.Series(dtype="object")), fruit_names)
+    encoded = masks != 0
+    counts = count_ingredients(orders.loc[~encoded, "INGREDIENTS"], fruit_names)
+    return counts + count_by_mask(masks[encoded].to_numpy(), fruit_ids)
+
+
+def count_recent_ingredients(session, fruit_names, hours=24, fruit_ids=None):
+    """Per-fruit counts over orders placed in the last `hours`, aggregated in Snowflake.
+
+    Each fruit becomes one SUM(IFF(...)) column, so a single row comes back
+    however many orders match. With FRUIT_ID encoding on, encoded orders are
+    tested against INGREDIENT_MASK instead of scanning INGREDIENTS.
+    """
+    padded = concat(lit(" "), col("INGREDIENTS"), lit(" "))
+    if encoding_enabled() and fruit_ids is not None:
+        matches = [
+            iff(col("INGREDIENT_MASK").is_null(), contains(padded, lit(f" {name} ")), contains_fruit(int(fruit_id)))
+            for name, fruit_id in zip(fruit_names, fruit_ids)
+        ]
+    else:
+        matches = [contains(padded, lit(f" {name} ")) for name in fruit_names]
+    aggregates = [sum_(iff(match, 1, 0)).alias(f"FRUIT_{i}") for i, match in enumerate(matches)]
+    recent = session.table(ORDERS_TABLE).filter(
+        col("ORDER_TS") >= dateadd("hour", lit(-hours), current_timestamp())
+    )
+    row = recent.agg(*aggregates).collect()[0]
+    return pd.Series([int(row[i] or 0) for i in range(len(fruit_names))], index=list(fruit_names), dtype="int64")
+
+
+class DemandCache:
+    """Stock prep counts cached per pending-board state.
+
+    Pending counts are recomputed only when the board's contents change (its
+    version); recent counts are recomputed when the watermark moves and also
+    every bucket_seconds so old orders age out of the window.
+    """
+
+    def __init__(self, bucket_seconds=300):
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        self._pending = (None, None)
+        self._recent = (None, None)
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, slot, key, compute):
+        with self._lock:
+            cached_key, value = getattr(self, slot)
+            if cached_key == key:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            setattr(self, slot, (key, value))
+        return value
+
+    def pending(self, pending_orders, fruit_names, board_version, fruit_ids=None):
+        key = (board_version, tuple(fruit_names))
+        return self._cached("_pending", key, lambda: count_pending_ingredients(
+            pending_orders, fruit_names, fruit_ids
+        ))
+
+    def recent(self, session, fruit_names, watermark_uid, hours=24, fruit_ids=None):
+        key = (watermark_uid, hours, tuple(fruit_names), int(time.time() // self.bucket_seconds))
+        return self._cached("_recent", key, lambda: count_recent_ingredients(
+            session, fruit_names, hours, fruit_ids
+        ))
@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from datetime import datetime
+
+APP_FILE = "streamlit_app.py"
+
+# share_app_test_runtime() patches Streamlit internals as they are in this release
+STREAMLIT_VERSION = "1.66.0"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Customer:
+    """One simulated customer walking through the order page with Streamlit's AppTest"""
+
+    def __init__(self, number, fruit_names, rng, timeout):
+        self.number = number
+        self.fruit_names = fruit_names
+        self.rng = rng
+        self.timeout = timeout
+        self.rerun_ms = []
+        self.orders = 0
+        self.errors = []
+
+    def _rerun(self, step):
+        started = time.perf_counter()
+        at = step()
+        self.rerun_ms.append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        return at
+
+    def place_order(self):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(APP_FILE, default_timeout=self.timeout)
+        at = self._rerun(at.run)
+        at = self._rerun(at.text_input[0].input(f"Customer {self.number}").run)
+        for fruit in self.rng.sample(self.fruit_names, self.rng.randint(1, 5)):
+            at = self._rerun(at.multiselect[0].select(fruit).run)
+        submit = next(button for button in at.button if button.label == "Submit order")
+        at = self._rerun(submit.click().run)
+        if not at.success:
+            raise RuntimeError("order was not confirmed")
+        self.orders += 1
+
+    def run(self, orders_each):
+        for _ in range(orders_each):
+            try:
+                self.place_order()
+            except Exception as e:
+                self.errors.append(str(e))
+
+
+@contextlib.contextmanager
+def share_app_test_runtime():
+    """Let several AppTest instances run the app at once, like sessions of one server.
+
+    AppTest assumes one script run per process: every run installs and then
+    clears a mock Runtime singleton, patches the config module and compiles the
+    script afresh (CPython's compiler is not safe to run in parallel). Install
+    one Runtime, one config patch and one ScriptCache up front and turn the
+    per-run versions into no-ops, so concurrent customers share them the way
+    browser sessions share a Streamlit server. Everything is restored on exit.
+
+    These are Streamlit internals, so any other Streamlit release is refused.
+    """
+    import types
+    from unittest.mock import MagicMock, patch
+
+    import streamlit
+    if streamlit.__version__ != STREAMLIT_VERSION:
+        raise RuntimeError(f"load_test.py needs streamlit=={STREAMLIT_VERSION} (found {streamlit.__version__})")
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    shared = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+
+    with contextlib.ExitStack() as patches:
+        patches.enter_context(patch.object(Runtime, "_instance", runtime))
+        # AppTest assigns Runtime._instance on this stand-in instead of the real class
+        patches.enter_context(patch.object(app_test, "Runtime", types.SimpleNamespace()))
+        patches.enter_context(patch.object(
+            config, "get_option", new=build_mock_config_get_option({"global.appTest": True})))
+        patches.enter_context(patch.object(
+            app_test, "patch_config_options", lambda overrides: contextlib.nullcontext()))
+        patches.enter_context(patch.object(
+            ScriptCache, "get_bytecode", lambda self, script_path: get_bytecode(shared, script_path)))
+        yield
+
+
+def run_load_test(customers, orders_each, backend, stub_latency, seed, timeout):
+    # Configure the stand-ins before the app modules are imported
+    os.environ["SMOOTHIES_BACKEND"] = backend
+    os.environ.setdefault("SMOOTHIES_LOCAL_DB", f"load_test_{backend}.db")
+
+    from smoothiefroot_stub import load_fruit_names, start_stub_server
+    stub, stub_url = start_stub_server(latency=stub_latency)
+    os.environ["SMOOTHIEFROOT_URL"] = stub_url
+
+    import local_snowpark
+
+    rng = random.Random(seed)
+    fruit_names = load_fruit_names()
+    simulated = [Customer(i + 1, fruit_names, random.Random(rng.random()), timeout) for i in range(customers)]
+
+    with share_app_test_runtime():
+        # Warm-up order so process-wide caches and the database exist before timing starts
+        Customer(0, fruit_names, random.Random(seed), timeout).place_order()
+        queries_before = local_snowpark.query_count()
+        stub_before = stub.RequestHandlerClass.requests_served
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=customer.run, args=(orders_each,)) for customer in simulated]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    rerun_ms = [ms for customer in simulated for ms in customer.rerun_ms]
+    orders = sum(customer.orders for customer in simulated)
+    queries = local_snowpark.query_count() - queries_before
+    nutrition_requests = stub.RequestHandlerClass.requests_served - stub_before
+    stub.shutdown()
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "backend": backend,
+        "customers": customers,
+        "orders_per_customer": orders_each,
+        "stub_latency_seconds": stub_latency,
+        "elapsed_seconds": round(elapsed, 3),
+        "orders": orders,
+        "errors": [error for customer in simulated for error in customer.errors],
+        "orders_per_second": round(orders / elapsed, 2) if elapsed else None,
+        "reruns": len(rerun_ms),
+        "rerun_ms": {
+            "p50": percentile(rerun_ms, 50),
+            "p95": percentile(rerun_ms, 95),
+            "p99": percentile(rerun_ms, 99),
+            "mean": statistics.fmean(rerun_ms) if rerun_ms else None,
+        },
+        "backend_queries_per_order": round(queries / orders, 2) if orders else None,
+        "nutrition_requests_per_order": round(nutrition_requests / orders, 2) if orders else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive streamlit_app.py with N simulated customers")
+    parser.add_argument("--customers", type=int, default=10)
+    parser.add_argument("--orders", type=int, default=3, help="orders per customer")
+    parser.add_argument("--backend", choices=("sqlite", "duckdb"), default="sqlite")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="SmoothieFroot stub delay in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    results = run_load_test(args.customers, args.orders, args.backend, args.stub_latency, args.seed, args.timeout)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    rerun = results["rerun_ms"]
+    print(f"{results['orders']} orders in {results['elapsed_seconds']}s "
+          f"({results['orders_per_second']} orders/s, {len(results['errors'])} errors)")
+    print(f"Rerun latency ms: p50={rerun['p50']:.1f} p95={rerun['p95']:.1f} p99={rerun['p99']:.1f}")
+    print(f"Backend queries/order: {results['backend_queries_per_order']}, "
+          f"SmoothieFroot requests/order: {results['nutrition_requests_per_order']}")
+    print(f"Results written to {args.output}")
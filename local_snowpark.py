@@ -0,0 +1,636 @@
+import itertools
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# Schema and seed data shipped with the repo
+DDL_FILE = "File for Table Creation.txt"
+FRUITS_FILE = "fruits_available_for_smoothies.txt"
+
+_aliases = itertools.count(1)
+_query_count = 0
+_query_count_lock = threading.Lock()
+
+
+def query_count():
+    """Statements executed by every local session in this process"""
+    return _query_count
+
+
+def _count_query():
+    global _query_count
+    with _query_count_lock:
+        _query_count += 1
+
+
+def local_name(name):
+    """smoothies.public.orders -> orders"""
+    return name.split(".")[-1].lower()
+
+
+def _strip_qualifiers(sql):
+    return re.sub(r"\bsmoothies\.public\.", "", sql, flags=re.IGNORECASE)
+
+
+def _bind_value(value):
+    # sqlite3 and duckdb only take plain Python scalars
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+# -- Column expressions ------------------------------------------------------
+
+class Column:
+    """Subset of snowpark.Column that renders to SQLite or DuckDB SQL"""
+
+    __hash__ = None
+
+    def __init__(self, render, name=None):
+        self._render = render
+        self.name = name
+
+    def render(self, dialect):
+        """Return (sql, params)"""
+        return self._render(dialect)
+
+    def _binary(self, op, other):
+        other = _to_column(other)
+
+        def render(dialect):
+            left_sql, left_params = self.render(dialect)
+            right_sql, right_params = other.render(dialect)
+            return f"({left_sql} {op} {right_sql})", left_params + right_params
+        return Column(render)
+
+    def __eq__(self, other):
+        return self._binary("=", other)
+
+    def __ne__(self, other):
+        return self._binary("<>", other)
+
+    def __gt__(self, other):
+        return self._binary(">", other)
+
+    def __ge__(self, other):
+        return self._binary(">=", other)
+
+    def __lt__(self, other):
+        return self._binary("<", other)
+
+    def __le__(self, other):
+        return self._binary("<=", other)
+
+    def __and__(self, other):
+        return self._binary("AND", other)
+
+    def __or__(self, other):
+        return self._binary("OR", other)
+
+    def __invert__(self):
+        def render(dialect):
+            sql, params = self.render(dialect)
+            return f"(NOT {sql})", params
+        return Column(render)
+
+    def isin(self, *values):
+        if len(values) == 1 and isinstance(values[0], (list, tuple, set)):
+            values = values[0]
+        values = [_bind_value(value) for value in values]
+
+        def render(dialect):
+            sql, params = self.render(dialect)
+            if not values:
+                return "(1 = 0)", []
+            return f"({sql} IN ({', '.join('?' for _ in values)}))", params + values
+        return Column(render)
+
+    def startswith(self, prefix):
+        def render(dialect):
+            sql, params = self.render(dialect)
+            return f"(substr({sql}, 1, {len(prefix)}) = ?)", params + [prefix]
+        return Column(render)
+
+    def is_null(self):
+        def render(dialect):
+            sql, params = self.render(dialect)
+            return f"({sql} IS NULL)", params
+        return Column(render)
+
+    def is_not_null(self):
+        def render(dialect):
+            sql, params = self.render(dialect)
+            return f"({sql} IS NOT NULL)", params
+        return Column(render)
+
+    def alias(self, name):
+        return Column(self._render, name.upper())
+
+    as_ = alias
+
+
+def _to_column(value):
+    return value if isinstance(value, Column) else lit(value)
+
+
+def col(name, qualifier=None):
+    name = name.upper()
+    prefix = f"{qualifier}." if qualifier else ""
+    return Column(lambda dialect: (prefix + name, []), name)
+
+
+def lit(value):
+    value = _bind_value(value)
+    if isinstance(value, datetime):
+        value = value.replace(tzinfo=None)
+
+    def render(dialect):
+        if value is None:
+            return "NULL", []
+        if dialect == "sqlite" and isinstance(value, datetime):
+            return "?", [value.isoformat(" ")]
+        return "?", [value]
+    return Column(render)
+
+
+def _function(template, *args, name=None):
+    columns = [_to_column(arg) for arg in args]
+
+    def render(dialect):
+        sqls, params = [], []
+        for column in columns:
+            sql, column_params = column.render(dialect)
+            sqls.append(sql)
+            params += column_params
+        return template(dialect, *sqls), params
+    return Column(render, name)
+
+
+def concat(*columns):
+    return _function(lambda dialect, *sqls: "(" + " || ".join(sqls) + ")", *columns)
+
+
+def contains(column, substring):
+    return _function(lambda dialect, a, b: f"(instr({a}, {b}) > 0)", column, substring)
+
+
+def iff(condition, when_true, when_false):
+    return _function(lambda dialect, c, a, b: f"(CASE WHEN {c} THEN {a} ELSE {b} END)",
+                     condition, when_true, when_false)
+
+
+def sum(column):
+    return _function(lambda dialect, a: f"SUM({a})", column)
+
+
+def bitand(left, right):
+    return _function(lambda dialect, a, b: f"({a} & {b})", left, right)
+
+
+def parse_json(column):
+    # Arrays are kept as JSON text in the local backends
+    return _function(lambda dialect, a: a, column)
+
+
+def current_timestamp():
+    return Column(lambda dialect: ("CURRENT_TIMESTAMP", []))
+
+
+def dateadd(part, amount, timestamp):
+    unit = {"hour": "hours", "minute": "minutes", "day": "days", "second": "seconds"}[part.lower()]
+
+    def template(dialect, n, ts):
+        if dialect == "sqlite":
+            return f"datetime({ts}, printf('%+d {unit}', {n}))"
+        return f"(CAST({ts} AS TIMESTAMP) + to_{unit}(CAST({n} AS BIGINT)))"
+    return _function(template, amount, timestamp)
+
+
+# -- MERGE / UPDATE ------------------------------------------------------------
+
+class _WhenMatched:
+    def __init__(self, condition=None):
+        self.condition = condition
+        self.assignments = None
+
+    def update(self, assignments):
+        self.assignments = assignments
+        return self
+
+
+def when_matched(condition=None):
+    return _WhenMatched(condition)
+
+
+class MergeResult:
+    def __init__(self, rows_inserted=0, rows_updated=0, rows_deleted=0):
+        self.rows_inserted = rows_inserted
+        self.rows_updated = rows_updated
+        self.rows_deleted = rows_deleted
+
+
+class UpdateResult:
+    def __init__(self, rows_updated=0, multi_joined_rows_updated=0):
+        self.rows_updated = rows_updated
+        self.multi_joined_rows_updated = multi_joined_rows_updated
+
+
+# -- DataFrames ----------------------------------------------------------------
+
+class Row(tuple):
+    """Result row readable by position, by column name or as an attribute"""
+
+    def __new__(cls, values, fields):
+        row = super().__new__(cls, values)
+        row._fields = {field: i for i, field in enumerate(fields)}
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._fields[key.upper()])
+        return tuple.__getitem__(self, key)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def as_dict(self):
+        return {field: tuple.__getitem__(self, i) for field, i in self._fields.items()}
+
+
+class LocalDataFrame:
+    """Lazily built single SELECT over one local table or view"""
+
+    def __init__(self, session, table, columns=None, where=(), order=(), limit=None, distinct=False):
+        self._session = session
+        self._table = table
+        self._alias = f"df_{next(_aliases)}"
+        self._columns = columns
+        self._where = list(where)
+        self._order = list(order)
+        self._limit = limit
+        self._distinct = distinct
+
+    def _copy(self, **changes):
+        state = dict(columns=self._columns, where=self._where, order=self._order,
+                     limit=self._limit, distinct=self._distinct)
+        state.update(changes)
+        copy = LocalDataFrame(self._session, self._table, **state)
+        copy._alias = self._alias
+        return copy
+
+    def __getitem__(self, name):
+        return col(name, qualifier=self._alias)
+
+    def select(self, *columns):
+        if len(columns) == 1 and isinstance(columns[0], (list, tuple)):
+            columns = columns[0]
+        return self._copy(columns=[col(c) if isinstance(c, str) else c for c in columns])
+
+    def filter(self, condition):
+        return self._copy(where=self._where + [condition])
+
+    where = filter
+
+    def sort(self, *columns):
+        return self._copy(order=self._order + [col(c) if isinstance(c, str) else c for c in columns])
+
+    order_by = sort
+
+    def limit(self, n):
+        return self._copy(limit=n)
+
+    def distinct(self):
+        return self._copy(distinct=True)
+
+    def agg(self, *columns):
+        return self.select(*columns)
+
+    def _where_sql(self, dialect):
+        sqls, params = [], []
+        for condition in self._where:
+            sql, condition_params = condition.render(dialect)
+            sqls.append(sql)
+            params += condition_params
+        return (" WHERE " + " AND ".join(sqls) if sqls else ""), params
+
+    def _query(self):
+        dialect = self._session.dialect
+        params = []
+        if self._columns:
+            selected = []
+            for column in self._columns:
+                sql, column_params = column.render(dialect)
+                params += column_params
+                selected.append(f'{sql} AS "{column.name}"' if column.name else sql)
+            select_list = ", ".join(selected)
+        else:
+            select_list = "*"
+        query = f"SELECT {'DISTINCT ' if self._distinct else ''}{select_list} FROM {self._table} AS {self._alias}"
+        where_sql, where_params = self._where_sql(dialect)
+        query += where_sql
+        params += where_params
+        if self._order:
+            order_sqls = []
+            for column in self._order:
+                sql, column_params = column.render(dialect)
+                order_sqls.append(sql)
+                params += column_params
+            query += " ORDER BY " + ", ".join(order_sqls)
+        if self._limit is not None:
+            query += f" LIMIT {int(self._limit)}"
+        return query, params
+
+    def to_pandas(self):
+        query, params = self._query()
+        rows, fields = self._session._execute(query, params)
+        return pd.DataFrame(rows, columns=fields)
+
+    def collect(self):
+        query, params = self._query()
+        rows, fields = self._session._execute(query, params)
+        return [Row(row, fields) for row in rows]
+
+    def count(self):
+        return len(self.collect())
+
+    def _update(self, assignments, condition, source=None):
+        dialect = self._session.dialect
+        set_sqls, params = [], []
+        for column, value in assignments.items():
+            sql, value_params = _to_column(value).render(dialect)
+            set_sqls.append(f"{column.upper()} = {sql}")
+            params += value_params
+        query = f"UPDATE {self._table} AS {self._alias} SET {', '.join(set_sqls)}"
+        if source is not None:
+            query += f" FROM {source._table} AS {source._alias}"
+        if condition is not None:
+            sql, condition_params = condition.render(dialect)
+            query += f" WHERE {sql}"
+            params += condition_params
+        return self._session._execute_update(query, params)
+
+    def update(self, assignments, condition=None):
+        return UpdateResult(self._update(assignments, condition))
+
+    def merge(self, source, join_expr, clauses):
+        """MERGE with when_matched([condition]).update(...) clauses (what the apps use), run as UPDATE ... FROM.
+
+        Any other clause raises ValueError before anything is written.
+        """
+        try:
+            for clause in clauses:
+                if not isinstance(clause, _WhenMatched) or clause.assignments is None:
+                    raise ValueError(
+                        f"Unsupported MERGE clause {clause!r}: the local backend only runs "
+                        "when_matched([condition]).update({...}) clauses"
+                    )
+            rows_updated = 0
+            for clause in clauses:
+                condition = join_expr if clause.condition is None else join_expr & clause.condition
+                rows_updated += self._update(clause.assignments, condition, source)
+        finally:
+            # A create_dataframe() source is only read by this MERGE
+            self._session._drop_temp_table(source._table)
+        return MergeResult(rows_updated=rows_updated)
+
+
+class LocalSQL:
+    def __init__(self, session, query, params):
+        self._session = session
+        self._query = query
+        self._params = params
+
+    def collect(self):
+        rows, fields = self._session._execute(self._query, self._params)
+        return [Row(row, fields) for row in rows]
+
+
+# -- Sessions ------------------------------------------------------------------
+
+class LocalSession:
+    """Snowpark-like session over a SQLite or DuckDB database file"""
+
+    def __init__(self, connection, dialect):
+        self._connection = connection
+        self.dialect = dialect
+        self._lock = threading.Lock()
+        self._temp_tables = itertools.count(1)
+        self._temp_names = set()
+        self.queries = 0
+
+    def _run(self, query, params):
+        self.queries += 1
+        _count_query()
+        params = [_bind_value(param) for param in params]
+        with self._lock:
+            cursor = self._connection.execute(query, params)
+            if self.dialect == "sqlite":
+                self._connection.commit()
+            return cursor
+
+    def _execute(self, query, params=()):
+        cursor = self._run(query, list(params))
+        if cursor.description is None:
+            return [], []
+        fields = [d[0].upper() for d in cursor.description]
+        return cursor.fetchall(), fields
+
+    def _execute_update(self, query, params):
+        cursor = self._run(query, params)
+        if self.dialect == "duckdb":
+            return cursor.fetchone()[0]
+        return cursor.rowcount
+
+    def table(self, name):
+        return LocalDataFrame(self, local_name(name))
+
+    def sql(self, query, params=None):
+        query = _strip_qualifiers(query)
+        if self.dialect == "duckdb":
+            query = _alias_values_columns(query)
+        return LocalSQL(self, query, params or [])
+
+    def create_dataframe(self, data):
+        """Copy a pandas DataFrame into a temporary table and return it as a DataFrame"""
+        data = pd.DataFrame(data)
+        name = f"tmp_df_{id(self)}_{next(self._temp_tables)}"
+        columns = [str(column).upper() for column in data.columns]
+        definitions = [f"{column} {_column_type(dtype)}" for column, dtype in zip(columns, data.dtypes)]
+        self._run(f"CREATE TEMP TABLE {name} ({', '.join(definitions)})", [])
+        self._temp_names.add(name)
+        rows = [tuple(_bind_value(value) for value in row)
+                for row in data.astype(object).where(data.notna(), None).itertuples(index=False)]
+        if rows:
+            placeholders = ", ".join("?" for _ in columns)
+            with self._lock:
+                self._connection.executemany(f"INSERT INTO {name} VALUES ({placeholders})", rows)
+                if self.dialect == "sqlite":
+                    self._connection.commit()
+        return LocalDataFrame(self, name)
+
+    def _drop_temp_table(self, name):
+        """Drop a table made by create_dataframe(); pooled sessions live long, so they are not left to pile up"""
+        if name in self._temp_names:
+            self._temp_names.discard(name)
+            self._run(f"DROP TABLE IF EXISTS {name}", [])
+
+    def close(self):
+        for name in list(self._temp_names):
+            self._drop_temp_table(name)
+        with self._lock:
+            self._connection.close()
+
+
+def _column_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype):
+        return "BOOLEAN"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "DOUBLE"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "VARCHAR"
+
+
+def _alias_values_columns(query):
+    # DuckDB names VALUES columns col0, col1...; Snowflake and SQLite use column1, column2...
+    match = re.search(r"\bfrom \(values (\([^)]*\))", query, flags=re.IGNORECASE)
+    if not match or not query.rstrip().endswith(")"):
+        return query
+    width = match.group(1).count("?") or match.group(1).count(",") + 1
+    return query.rstrip() + " AS v(" + ", ".join(f"column{i}" for i in range(1, width + 1)) + ")"
+
+
+# -- Schema and seed data ----------------------------------------------------------
+
+def translate_ddl(statement, dialect):
+    """Rewrite one Snowflake statement from the DDL file for SQLite or DuckDB"""
+    sql = _strip_qualifiers(statement)
+    sql = re.sub(r"create or replace table", "create table if not exists", sql, flags=re.IGNORECASE)
+    if dialect == "sqlite":
+        sql = re.sub(r"NUMBER\(\d+,\s*0\)\s+DEFAULT\s+\w+\.NEXTVAL", "INTEGER PRIMARY KEY AUTOINCREMENT", sql,
+                     flags=re.IGNORECASE)
+    else:
+        sql = re.sub(r"DEFAULT\s+(\w+)\.NEXTVAL", r"DEFAULT nextval('\1')", sql, flags=re.IGNORECASE)
+        sql = re.sub(r"add column", "add column if not exists", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"NUMBER\(\d+,\s*0\)", "BIGINT", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"TIMESTAMP_LTZ\(\d+\)", "TIMESTAMP", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"CURRENT_TIMESTAMP\(\)", "CURRENT_TIMESTAMP", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bARRAY\b", "TEXT" if dialect == "sqlite" else "VARCHAR", sql)
+    return sql
+
+
+def ddl_statements(path=DDL_FILE):
+    """create table / alter table statements from the DDL file, comments removed"""
+    with open(path, encoding="utf-8") as f:
+        text = "\n".join(line for line in f.read().splitlines() if not line.lstrip().startswith("#"))
+    statements = [s.strip() for s in text.split(";") if s.strip()]
+    return [s for s in statements if re.match(r"(create or replace table|alter table)", s, re.IGNORECASE)]
+
+
+# Local equivalent of the ORDERS_DECODED view in the DDL file
+DECODED_VIEW_SQL = {
+    "sqlite": """
+create view if not exists orders_decoded as
+select o.ORDER_UID, o.ORDER_FILLED, o.NAME_ON_ORDER,
+    coalesce(o.INGREDIENTS, (
+        select group_concat(name, '') from (
+            select f.FRUIT_NAME || ' ' as name
+            from json_each(o.INGREDIENT_IDS) j join fruit_options f on f.FRUIT_ID = j.value
+            order by j.key
+        )
+    )) as INGREDIENTS,
+    o.ORDER_TS, o.INGREDIENT_IDS, o.INGREDIENT_MASK
+from orders o
+""",
+    "duckdb": """
+create view if not exists orders_decoded as
+select o.ORDER_UID, o.ORDER_FILLED, o.NAME_ON_ORDER,
+    coalesce(o.INGREDIENTS, (
+        select string_agg(f.FRUIT_NAME || ' ', '' order by u.pos)
+        from (
+            select unnest(from_json(o.INGREDIENT_IDS, '["BIGINT"]')) as id,
+                unnest(range(len(from_json(o.INGREDIENT_IDS, '["BIGINT"]')))) as pos
+        ) u join fruit_options f on f.FRUIT_ID = u.id
+    )) as INGREDIENTS,
+    o.ORDER_TS, o.INGREDIENT_IDS, o.INGREDIENT_MASK
+from orders o
+""",
+}
+
+
+def seed_database(connection, dialect, ddl_path=DDL_FILE, fruits_path=FRUITS_FILE):
+    """Create the tables from the DDL file and load the fruit list if it is empty"""
+    if dialect == "duckdb":
+        connection.execute("create sequence if not exists order_seq")
+    for statement in ddl_statements(ddl_path):
+        try:
+            connection.execute(translate_ddl(statement, dialect))
+        except sqlite3.OperationalError as e:
+            # SQLite has no "add column if not exists"
+            if "duplicate column" not in str(e):
+                raise
+    connection.execute(DECODED_VIEW_SQL[dialect])
+
+    if connection.execute("select count(*) from fruit_options").fetchone()[0] == 0:
+        fruits = []
+        with open(fruits_path, encoding="utf-8") as f:
+            for line in f:
+                name, _, fruit_id = line.strip().partition("%")
+                if fruit_id.isdigit():
+                    fruits.append((int(fruit_id), name, name))
+        connection.executemany(
+            "insert into fruit_options(FRUIT_ID, FRUIT_NAME, SEARCH_ON) values (?, ?, ?)", fruits
+        )
+    if dialect == "sqlite":
+        connection.commit()
+    else:
+        # Write the schema into the database file so DuckDB never has to replay the ALTERs from its WAL
+        connection.execute("checkpoint")
+
+
+_duckdb_databases = {}
+_duckdb_lock = threading.Lock()
+_seeded = set()
+_seed_lock = threading.Lock()
+
+
+def _sqlite_boolean(value):
+    return value not in (b"0", b"")
+
+
+def connect(dialect="sqlite", path="smoothies_local.db"):
+    """Open a LocalSession on the given database file, creating and seeding it on first use"""
+    if dialect == "sqlite":
+        # SQLite hands BOOLEAN columns back as Python bools (see sqlite3.PARSE_DECLTYPES);
+        # registered on first connect rather than at import
+        sqlite3.register_converter("BOOLEAN", _sqlite_boolean)
+        connection = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        connection.execute("pragma journal_mode=wal")
+        connection.create_function("parse_json", 1, lambda text: text)
+    elif dialect == "duckdb":
+        import duckdb
+        # One database instance per file; each session gets its own cursor on it
+        with _duckdb_lock:
+            if path not in _duckdb_databases:
+                database = duckdb.connect(path)
+                database.create_function("parse_json", lambda text: text, ["VARCHAR"], "VARCHAR",
+                                         null_handling="special")
+                _duckdb_databases[path] = database
+            connection = _duckdb_databases[path].cursor()
+    else:
+        raise ValueError(f"Unknown local backend {dialect!r}")
+
+    with _seed_lock:
+        if (dialect, path) not in _seeded:
+            seed_database(connection, dialect)
+            _seeded.add((dialect, path))
+    return LocalSession(connection, dialect)
@@ -0,0 +1,171 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Public SmoothieFroot API; override with SMOOTHIEFROOT_URL to point at a stub server
+DEFAULT_BASE_URL = "https://my.smoothiefroot.com/api/fruit/"
+
+
+class LRUTTLCache:
+    """Bounded LRU cache whose entries also expire after ttl_seconds.
+
+    Timestamps are wall-clock so the cache can be saved to disk and reloaded
+    by another process.
+    """
+
+    def __init__(self, maxsize=256, ttl_seconds=3600):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value, stored_at=None):
+        with self._lock:
+            self._data[key] = (stored_at or time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def save(self, path):
+        """Write the live entries to a JSON file (atomic replace; concurrent saves each use their own temp file)"""
+        with self._lock:
+            now = time.time()
+            entries = [[key, stored_at, value] for key, (stored_at, value) in self._data.items()
+                       if now - stored_at <= self.ttl_seconds]
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def load(self, path):
+        """Load entries saved by save(); missing or unreadable files are ignored"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        for key, stored_at, value in entries:
+            if time.time() - stored_at <= self.ttl_seconds:
+                self.put(key, value, stored_at=stored_at)
+        return len(self)
+
+
+class NutritionClient:
+    """SmoothieFroot client with a pooled HTTP session, parallel fan-out and a cache"""
+
+    def __init__(self, base_url=None, max_workers=5, timeout=5.0,
+                 cache_size=256, cache_ttl_seconds=3600, cache_path=None):
+        self.base_url = base_url or os.environ.get("SMOOTHIEFROOT_URL", DEFAULT_BASE_URL)
+        if not self.base_url.endswith("/"):
+            self.base_url += "/"
+        self.timeout = timeout
+        self.cache_path = cache_path
+
+        # One keep-alive session shared by all worker threads
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="smoothiefroot")
+
+        self.cache = LRUTTLCache(maxsize=cache_size, ttl_seconds=cache_ttl_seconds)
+        if cache_path:
+            self.cache.load(cache_path)
+
+        # search_on -> latency in milliseconds of the most recent lookup (0.0 on a cache hit)
+        self.latencies_ms = {}
+        self.fetches = 0
+        self.cache_hits = 0
+        self._stats_lock = threading.Lock()
+
+    def _fetch(self, search_on):
+        started = time.perf_counter()
+        try:
+            response = self.http.get(self.base_url + search_on, timeout=self.timeout)
+            data = response.json()
+            ok = response.status_code == 200
+        except (requests.RequestException, ValueError) as e:
+            data = {"error": str(e)}
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.fetches += 1
+            self.latencies_ms[search_on] = elapsed_ms
+        # Only successful lookups are cached so a transient failure is retried next time
+        if ok:
+            self.cache.put(search_on, data)
+        return data, ok
+
+    def get(self, search_on):
+        """Nutrition JSON for a single fruit (None if it has no SEARCH_ON)"""
+        return self.get_many([search_on]).get(search_on)
+
+    def get_many(self, search_ons):
+        """Nutrition JSON for several fruits; cache misses are fetched in parallel.
+
+        Fruits without a SEARCH_ON (None) are skipped and have no entry in the result.
+        """
+        results = {}
+        misses = []
+        for search_on in dict.fromkeys(search_ons):
+            if search_on is None:
+                continue
+            cached = self.cache.get(search_on)
+            if cached is not None:
+                results[search_on] = cached
+                with self._stats_lock:
+                    self.cache_hits += 1
+                    self.latencies_ms[search_on] = 0.0
+            else:
+                misses.append(search_on)
+
+        stored = False
+        for search_on, (data, ok) in zip(misses, self._pool.map(self._fetch, misses)):
+            results[search_on] = data
+            stored = stored or ok
+
+        if stored and self.cache_path:
+            self.cache.save(self.cache_path)
+        return results
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "fetches": self.fetches,
+                "cache_hits": self.cache_hits,
+                "cached_fruits": len(self.cache),
+            }
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.http.close()
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns of the matrix, taken from the "nutrition" object of a SmoothieFroot response
+NUTRIENTS = ("calories", "carbs", "fat", "protein", "sugar")
+
+
+def nutrient_row(payload):
+    """One fruit's nutrients as floats in NUTRIENTS order; NaN where the API gave nothing"""
+    nutrition = payload.get("nutrition") or {}
+    row = []
+    for nutrient in NUTRIENTS:
+        try:
+            row.append(float(nutrition[nutrient]))
+        except (KeyError, TypeError, ValueError):
+            row.append(np.nan)
+    return row
+
+
+class NutritionMatrix:
+    """Fruits x nutrients matrix kept in memory and refreshed in the background.
+
+    A refresh asks the catalog for every fruit, fetches them all through the
+    NutritionClient (cache misses in parallel) and swaps in a new snapshot, so
+    readers never wait on SmoothieFroot. Totals for a selection are a single
+    row-sum over the matrix.
+    """
+
+    def __init__(self, fruit_catalog, nutrition_client, refresh_seconds=3600):
+        self.fruit_catalog = fruit_catalog
+        self.nutrition_client = nutrition_client
+        self.refresh_seconds = refresh_seconds
+        # (row index by fruit name, values, payload by fruit name, built at)
+        self._snapshot = ({}, np.empty((0, len(NUTRIENTS))), {}, None)
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.last_refresh_ms = None
+
+    def refresh(self):
+        """Rebuild the matrix from the catalog and SmoothieFroot"""
+        started = time.perf_counter()
+        names = self.fruit_catalog.names()
+        search_ons = [self.fruit_catalog.search_on(name) for name in names]
+        responses = self.nutrition_client.get_many([s for s in search_ons if s])
+
+        index, rows, payloads = {}, [], {}
+        for name, search_on in zip(names, search_ons):
+            payload = responses.get(search_on)
+            if not payload or "error" in payload:
+                continue
+            index[name] = len(rows)
+            rows.append(nutrient_row(payload))
+            payloads[name] = payload
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(NUTRIENTS))
+
+        self._snapshot = (index, values, payloads, time.time())
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        self._ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the previous snapshot; try again on the next cycle
+                self.refresh_errors += 1
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background refresher (first refresh begins immediately)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nutrition-matrix", daemon=True)
+            self._thread.start()
+        return self
+
+    def request_refresh(self):
+        """Ask the background thread to refresh now instead of waiting for the interval"""
+        self._wake.set()
+
+    def wait_ready(self, timeout=None):
+        """Block until the first snapshot exists; returns False on timeout"""
+        return self._ready.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def payload(self, fruit_name):
+        """Raw SmoothieFroot JSON for a fruit, or None if it is not loaded yet"""
+        return self._snapshot[2].get(fruit_name)
+
+    def missing(self, fruit_names):
+        """Fruits in the selection that the current snapshot has no nutrition for"""
+        index = self._snapshot[0]
+        return [name for name in fruit_names if name not in index]
+
+    def totals(self, fruit_names, payloads=None):
+        """Combined nutrition of a selection as a Series indexed by NUTRIENTS.
+
+        payloads ({fruit name: SmoothieFroot JSON}) stand in for fruits the
+        snapshot does not have yet, e.g. ones fetched directly while it is
+        cold. Fruits with neither are left out (see missing()); a nutrient
+        that none of the selected fruits report comes back as NaN.
+        """
+        index, values = self._snapshot[0], self._snapshot[1]
+        rows = [index[name] for name in fruit_names if name in index]
+        extra = [nutrient_row(payload) for name, payload in (payloads or {}).items()
+                 if name in fruit_names and name not in index and payload and "error" not in payload]
+        selected = np.vstack([values[rows], np.array(extra, dtype=np.float64).reshape(len(extra), len(NUTRIENTS))])
+        totals = np.where(np.isnan(selected).all(axis=0), np.nan, np.nansum(selected, axis=0))
+        return pd.Series(totals, index=NUTRIENTS)
+
+    def stats(self):
+        index, _, _, built_at = self._snapshot
+        return {
+            "fruits": len(index),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "last_refresh_ms": self.last_refresh_ms,
+            "age_seconds": time.time() - built_at if built_at else None,
+        }
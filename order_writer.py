@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Orders table in Snowflake (see "File for Table Creation.txt")
+ORDERS_TABLE = "smoothies.public.orders"
+ORDER_COLUMNS = ("INGREDIENTS", "NAME_ON_ORDER")
+
+# FRUIT_ID-encoded orders (see ingredient_codec); the array arrives as JSON text
+ENCODED_ORDER_COLUMNS = ("INGREDIENTS", "NAME_ON_ORDER", "INGREDIENT_IDS", "INGREDIENT_MASK")
+ENCODED_ORDER_EXPRESSIONS = ("column1", "column2", "parse_json(column3)", "column4")
+
+# SQLite stand-in for the ORDERS DDL, used to exercise the writer locally
+SQLITE_ORDERS_DDL = """
+create table if not exists orders (
+    ORDER_UID integer primary key autoincrement,
+    ORDER_FILLED boolean default 0,
+    NAME_ON_ORDER varchar(100),
+    INGREDIENTS varchar(200),
+    ORDER_TS timestamp default current_timestamp,
+    INGREDIENT_IDS text,
+    INGREDIENT_MASK integer
+)
+"""
+
+
+def build_insert(table, columns, row_count, expressions=None):
+    """Multi-row insert with qmark placeholders, e.g. values (?, ?), (?, ?).
+
+    When expressions are given (e.g. parse_json(column3)), the rows are
+    selected from a VALUES list so functions can be applied to bound values.
+    """
+    row = "(" + ", ".join("?" for _ in columns) + ")"
+    values = "values " + ", ".join([row] * row_count)
+    if expressions:
+        return f"insert into {table}({', '.join(columns)}) select {', '.join(expressions)} from ({values})"
+    return f"insert into {table}({', '.join(columns)}) {values}"
+
+
+def snowpark_inserter(session_manager, table=ORDERS_TABLE, columns=ORDER_COLUMNS, expressions=None):
+    """Insert callable that binds the rows as parameters of one Snowpark statement"""
+    def insert_rows(rows):
+        params = [value for row in rows for value in row]
+        with session_manager.lease() as session:
+            session.sql(build_insert(table, columns, len(rows), expressions), params=params).collect()
+    return insert_rows
+
+
+def sqlite_inserter(connection, table="orders", columns=ORDER_COLUMNS, expressions=None):
+    """Insert callable for a sqlite3 connection opened with check_same_thread=False"""
+    lock = threading.Lock()
+    # SQLite stores the INGREDIENT_IDS array as its JSON text
+    connection.create_function("parse_json", 1, lambda text: text)
+
+    def insert_rows(rows):
+        params = [value for row in rows for value in row]
+        with lock, connection:
+            connection.execute(build_insert(table, columns, len(rows), expressions), params)
+    return insert_rows
+
+
+class OrderWriter:
+    """Group-commit queue for smoothie orders.
+
+    submit() returns a Future for that order. A background thread collects
+    queued orders and writes them as one multi-row insert once max_batch
+    orders are waiting or the oldest has waited max_delay_ms, then resolves
+    every order's Future (or fails all of them with the insert error).
+    """
+
+    def __init__(self, insert_rows, max_batch=25, max_delay_ms=200):
+        self._insert_rows = insert_rows
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self._queue = queue.Queue()
+        self._closed = False
+        self.orders_written = 0
+        self.batches_written = 0
+        self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, *row):
+        """Queue one order row (a value per insert column); the Future resolves once it is committed"""
+        if self._closed:
+            raise RuntimeError("OrderWriter is closed")
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Write what we have, then let _run see the shutdown marker
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+            rows = [row for row, _ in batch]
+            try:
+                self._insert_rows(rows)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.orders_written += len(batch)
+            self.batches_written += 1
+            for _, future in batch:
+                future.set_result(True)
+
+    def stats(self):
+        return {
+            "orders_written": self.orders_written,
+            "batches_written": self.batches_written,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self, timeout=None):
+        """Flush queued orders and stop the background thread"""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
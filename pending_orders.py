@@ -0,0 +1,177 @@
+import threading
+import time
+
+import pandas as pd
+
+from ingredient_codec import orders_source
+from smoothie_backend import col, when_matched
+
+# Orders table in Snowflake (see "File for Table Creation.txt")
+ORDERS_TABLE = "smoothies.public.orders"
+
+
+class PendingOrderBoard:
+    """In-memory copy of the unfilled orders, kept current by incremental polls.
+
+    The first poll loads every pending order. Later polls only fetch pending
+    rows with ORDER_UID above the watermark, plus the ORDER_UIDs still pending
+    between the oldest held order and the watermark (held orders missing from
+    those were filled), so the work per poll does not grow with order history. Sequence values can commit out of order, so
+    each poll also re-reads the lookback_uids below the watermark; an order
+    that commits later than that, or is un-filled after leaving the board,
+    only comes back with a full reload().
+    """
+
+    def __init__(self, min_poll_interval=2.0, lookback_uids=100):
+        self.min_poll_interval = min_poll_interval
+        self.lookback_uids = lookback_uids
+        self._lock = threading.Lock()
+        self._orders = None
+        self.watermark_uid = None
+        self.watermark_ts = None
+        self.last_poll = 0.0
+        self.polls = 0
+        self.rows_fetched = 0
+        # Bumped whenever the pending set changes; cheap cache key for results derived from it
+        self.version = 0
+
+    def _advance_watermark(self, new_rows):
+        if new_rows.empty:
+            return
+        self.watermark_uid = max(int(new_rows["ORDER_UID"].max()), self.watermark_uid or 0)
+        latest_ts = new_rows["ORDER_TS"].max()
+        if self.watermark_ts is None or latest_ts > self.watermark_ts:
+            self.watermark_ts = latest_ts
+
+    def _full_load(self, session):
+        orders = session.table(orders_source()).filter(col("ORDER_FILLED") == 0).to_pandas()
+        self._orders = orders.sort_values("ORDER_UID").reset_index(drop=True)
+        self.watermark_uid = None
+        self.watermark_ts = None
+        self._advance_watermark(self._orders)
+        self.rows_fetched += len(orders)
+        self.version += 1
+
+    def _incremental_load(self, session):
+        orders = session.table(orders_source())
+
+        new_rows = orders.filter(col("ORDER_FILLED") == 0)
+        if self.watermark_uid is not None:
+            # Re-read a window below the watermark for orders that committed out of sequence order
+            new_rows = new_rows.filter(col("ORDER_UID") > self.watermark_uid - self.lookback_uids)
+        new_rows = new_rows.to_pandas()
+        new_rows = new_rows[~new_rows["ORDER_UID"].isin(self._orders["ORDER_UID"])]
+
+        filled_uids, checked = [], 0
+        if not self._orders.empty:
+            # Held orders that are no longer pending have been filled (or deleted) since
+            still_pending = orders.filter(
+                (col("ORDER_FILLED") == 0)
+                & (col("ORDER_UID") >= int(self._orders["ORDER_UID"].min()))
+                & (col("ORDER_UID") <= self.watermark_uid)
+            ).select(col("ORDER_UID")).to_pandas()["ORDER_UID"]
+            filled_uids = self._orders.loc[~self._orders["ORDER_UID"].isin(still_pending), "ORDER_UID"].tolist()
+            checked = len(still_pending)
+
+        pending = self._orders[~self._orders["ORDER_UID"].isin(filled_uids)]
+        if not new_rows.empty:
+            pending = pd.concat([pending, new_rows], ignore_index=True).sort_values("ORDER_UID")
+        self._orders = pending.reset_index(drop=True)
+        self._advance_watermark(new_rows)
+        self.rows_fetched += len(new_rows) + checked
+        if filled_uids or not new_rows.empty:
+            self.version += 1
+
+    def poll(self, session, force=False):
+        """Bring the board up to date; skipped if polled within min_poll_interval"""
+        with self._lock:
+            if not force and self._orders is not None and \
+                    time.monotonic() - self.last_poll < self.min_poll_interval:
+                return False
+            if self._orders is None:
+                self._full_load(session)
+            else:
+                self._incremental_load(session)
+            self.last_poll = time.monotonic()
+            self.polls += 1
+            return True
+
+    def reload(self, session):
+        """Discard the in-memory set and load all pending orders again"""
+        with self._lock:
+            self._orders = None
+        return self.poll(session, force=True)
+
+    def snapshot(self):
+        """Copy of the pending orders, oldest first"""
+        with self._lock:
+            if self._orders is None:
+                return pd.DataFrame()
+            return self._orders.copy()
+
+    def versioned_snapshot(self):
+        """(version, snapshot()) read together, for caching results derived from the pending set"""
+        with self._lock:
+            if self._orders is None:
+                return self.version, pd.DataFrame()
+            return self.version, self._orders.copy()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": 0 if self._orders is None else len(self._orders),
+                "watermark_uid": self.watermark_uid,
+                "watermark_ts": str(self.watermark_ts) if self.watermark_ts is not None else None,
+                "polls": self.polls,
+                "version": self.version,
+                "rows_fetched": self.rows_fetched,
+            }
+
+
+def changed_fill_status(original, edited):
+    """Rows whose ORDER_FILLED was changed in the editor, with the value it had before"""
+    before = original[["ORDER_UID", "ORDER_FILLED"]].rename(columns={"ORDER_FILLED": "ORDER_FILLED_WAS"})
+    merged = before.merge(edited[["ORDER_UID", "ORDER_FILLED"]], on="ORDER_UID")
+    return merged[merged["ORDER_FILLED"] != merged["ORDER_FILLED_WAS"]].reset_index(drop=True)
+
+
+def apply_fill_changes(session, changes):
+    """Write only the changed ORDER_FILLED values in one MERGE and return the rows updated.
+
+    A row is only updated while ORDER_FILLED still holds the value the editor
+    loaded, so a change made meanwhile from another tablet is not overwritten.
+    """
+    if changes.empty:
+        return 0
+    source = session.create_dataframe(changes[["ORDER_UID", "ORDER_FILLED", "ORDER_FILLED_WAS"]])
+    target = session.table(ORDERS_TABLE)
+    result = target.merge(
+        source,
+        target["ORDER_UID"] == source["ORDER_UID"],
+        [when_matched(target["ORDER_FILLED"] == source["ORDER_FILLED_WAS"]).update(
+            {"ORDER_FILLED": source["ORDER_FILLED"]}
+        )],
+    )
+    return result.rows_updated
+
+
+def fetch_pending_page(session, after_uid=None, page_size=50, ts_from=None, ts_to=None, name_prefix=None):
+    """One page of pending orders, keyset-paginated on ORDER_UID in Snowflake.
+
+    Returns (page, has_more). Pass the last ORDER_UID of a page as after_uid
+    to get the next one; filters and LIMIT are pushed down so only page_size
+    rows are ever transferred.
+    """
+    orders = session.table(orders_source()).filter(col("ORDER_FILLED") == 0)
+    if after_uid is not None:
+        orders = orders.filter(col("ORDER_UID") > int(after_uid))
+    if ts_from is not None:
+        orders = orders.filter(col("ORDER_TS") >= ts_from)
+    if ts_to is not None:
+        orders = orders.filter(col("ORDER_TS") < ts_to)
+    if name_prefix:
+        orders = orders.filter(col("NAME_ON_ORDER").startswith(name_prefix))
+
+    # One extra row tells us whether another page follows
+    page = orders.sort(col("ORDER_UID")).limit(page_size + 1).to_pandas()
+    return page.head(page_size), len(page) > page_size
@@ -0,0 +1,37 @@
+import os
+
+# "snowflake" (default), or "sqlite" / "duckdb" to run the smoothie apps on a local file
+BACKEND_ENV = "SMOOTHIES_BACKEND"
+LOCAL_DB_ENV = "SMOOTHIES_LOCAL_DB"
+
+
+def backend_name():
+    return os.environ.get(BACKEND_ENV, "snowflake").lower()
+
+
+def local_db_path():
+    default = "smoothies_local.duckdb" if backend_name() == "duckdb" else "smoothies_local.db"
+    return os.environ.get(LOCAL_DB_ENV, default)
+
+
+if backend_name() == "snowflake":
+    from snowflake.snowpark.functions import (  # noqa: F401
+        bitand, col, concat, contains, current_timestamp, dateadd, iff, lit, parse_json, sum, when_matched,
+    )
+else:
+    from local_snowpark import (  # noqa: F401
+        bitand, col, concat, contains, current_timestamp, dateadd, iff, lit, parse_json, sum, when_matched,
+    )
+
+
+def session_factory(options):
+    """Callable creating a session for the configured backend"""
+    if backend_name() == "snowflake":
+        def create():
+            from snowflake.snowpark import Session
+            return Session.builder.configs(dict(options)).create()
+        return create
+
+    import local_snowpark
+    dialect, path = backend_name(), local_db_path()
+    return lambda: local_snowpark.connect(dialect, path)
@@ -0,0 +1,104 @@
+import argparse
+import json
+import threading
+import time
+import zlib
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Fruit list shipped with the repo ("fruit_name%fruit_id" per line)
+FRUITS_FILE = "fruits_available_for_smoothies.txt"
+
+
+def load_fruit_names(path=FRUITS_FILE):
+    """Fruit names from fruits_available_for_smoothies.txt"""
+    names = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            name, _, fruit_id = line.strip().partition("%")
+            if fruit_id.isdigit():
+                names.append(name)
+    return names
+
+
+def search_key(search_on):
+    """Lookup key for a SEARCH_ON value: case and spaces are ignored"""
+    return unquote(search_on).lower().replace(" ", "")
+
+
+def fake_nutrition(name):
+    """Deterministic SmoothieFroot-shaped payload for a fruit name"""
+    seed = zlib.crc32(name.lower().encode())
+    return {
+        "name": name,
+        "id": seed % 1000,
+        "family": "Stubaceae",
+        "order": "Stubales",
+        "genus": name.split()[0],
+        "nutrition": {
+            "calories": float(20 + seed % 80),
+            "carbs": round(5 + seed % 200 / 10, 1),
+            "fat": round(seed % 30 / 10, 1),
+            "protein": round(seed % 25 / 10, 1),
+            "sugar": round(2 + seed % 150 / 10, 1),
+        },
+    }
+
+
+class SmoothieFrootStubHandler(BaseHTTPRequestHandler):
+    # Set by make_stub_server
+    fruits = {}
+    latency = 0.0
+    requests_served = 0
+    _counter_lock = threading.Lock()
+
+    def do_GET(self):
+        prefix = "/api/fruit/"
+        if self.latency:
+            time.sleep(self.latency)
+        with self._counter_lock:
+            type(self).requests_served += 1
+
+        search_on = self.path[len(prefix):].strip("/") if self.path.startswith(prefix) else ""
+        payload = self.fruits.get(search_key(search_on))
+        status = 200 if payload else 404
+        body = json.dumps(payload or {"error": "Not found"}).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_stub_server(port=0, latency=0.0, fruit_names=None):
+    """Build a threaded stub server; port 0 picks a free port"""
+    names = fruit_names if fruit_names is not None else load_fruit_names()
+    handler = type("StubHandler", (SmoothieFrootStubHandler,), {
+        "fruits": {search_key(name): fake_nutrition(name) for name in names},
+        "latency": latency,
+        "requests_served": 0,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def start_stub_server(port=0, latency=0.0, fruit_names=None):
+    """Run the stub in a daemon thread and return (server, base_url)"""
+    server = make_stub_server(port, latency, fruit_names)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/fruit/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SmoothieFroot stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to sleep per request")
+    args = parser.parse_args()
+
+    server = make_stub_server(args.port, args.latency)
+    print(f"Serving SmoothieFroot stub on http://127.0.0.1:{args.port}/api/fruit/")
+    print(f"Run the app with SMOOTHIEFROOT_URL=http://127.0.0.1:{args.port}/api/fruit/")
+    server.serve_forever()
@@ -0,0 +1,128 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from smoothie_backend import session_factory
+
+
+class SessionManager:
+    """Process-wide pool of Snowpark sessions.
+
+    Sessions are created lazily, handed out with lease() and returned to the
+    pool afterwards, so reruns and browser sessions reuse the same logins.
+    At most max_sessions exist at once; further leases wait for one to be
+    returned. A session idle for longer than health_check_interval is pinged
+    before reuse and replaced if the ping fails.
+    """
+
+    def __init__(self, factory, max_sessions=4, health_check_interval=60, acquire_timeout=30):
+        self._factory = factory
+        self.max_sessions = max_sessions
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        self._idle = []  # [(session, last_used)]
+        self._open = 0
+        self.created = 0
+        self.reused = 0
+        self.reconnects = 0
+        self.health_checks = 0
+
+    def _count(self, counter):
+        with self._cond:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _is_alive(self, session):
+        self._count("health_checks")
+        try:
+            session.sql("select 1").collect()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, session):
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while not self._idle and self._open >= self.max_sessions:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"All {self.max_sessions} Snowflake sessions are busy")
+                self._cond.wait(remaining)
+            if self._idle:
+                session, last_used = self._idle.pop()
+            else:
+                # Reserve the slot before logging in outside the lock
+                self._open += 1
+                session, last_used = None, None
+
+        if session is not None:
+            if time.monotonic() - last_used < self.health_check_interval or self._is_alive(session):
+                self._count("reused")
+                return session
+            self._close_quietly(session)
+            self._count("reconnects")
+
+        try:
+            session = self._factory()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        self._count("created")
+        return session
+
+    def _checkin(self, session):
+        with self._cond:
+            self._idle.append((session, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self):
+        """Borrow a live session for the duration of the with block"""
+        session = self._checkout()
+        try:
+            yield session
+        finally:
+            self._checkin(session)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "reconnects": self.reconnects,
+                "health_checks": self.health_checks,
+                "open": self._open,
+                "idle": len(self._idle),
+            }
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for session, _ in idle:
+            self._close_quietly(session)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_session_manager(options, **kwargs):
+    """The shared SessionManager for a set of connection options (one per process).
+
+    With SMOOTHIES_BACKEND=sqlite or duckdb the options are ignored and
+    sessions open the local stand-in database instead.
+    """
+    key = tuple(sorted((k, str(v)) for k, v in dict(options).items()))
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = SessionManager(session_factory(options), **kwargs)
+        return _managers[key]
@@ -1,8 +1,12 @@
 # Import python packages
 import streamlit as st
-import requests
-import pandas as pd
-from snowflake.snowpark.functions import col
+from fruit_catalog import FruitCatalog, load_fruit_options
+from nutrition_client import NutritionClient
+from nutrition_matrix import NutritionMatrix
+from ingredient_codec import encode_ingredients, encoding_enabled
+from order_writer import ENCODED_ORDER_COLUMNS, ENCODED_ORDER_EXPRESSIONS, OrderWriter, snowpark_inserter
+from smoothie_backend import backend_name
+from snowflake_session import get_session_manager
 # Write directly to the app
 st.title(":cup_with_straw: Custome Your Smoothie!:cup_with_straw:")
 st.write(
@@ -12,19 +16,59 @@ st.write(
 name_on_order = st.text_input("Name on Smoothie :")
 st.write("The Name on Smoothie will be :", name_on_order)
 
-cnx=st.connection("snowflake")
-session = cnx.session()
-my_dataframe = session.table("smoothies.public.fruit_options").select(col('Fruit_name'),col('SEARCH_ON'))
-# st.dataframe(data=my_dataframe, use_container_width=True)
-# st.stop()
+# Process-wide Snowflake session pool, configured from [connections.snowflake] in secrets
+# (SMOOTHIES_BACKEND=sqlite/duckdb runs on a local stand-in database instead)
+def snowflake_options():
+    try:
+        return st.secrets["connections"]["snowflake"]
+    except (KeyError, FileNotFoundError):
+        st.error("Snowflake is not configured: add a [connections.snowflake] section to .streamlit/secrets.toml "
+                 "(or set SMOOTHIES_BACKEND=sqlite to run on a local database).")
+        st.stop()
 
-pd_df=my_dataframe.to_pandas()
-# st.dataframe(pd_df)
-# st.stop()
+sf_options = snowflake_options() if backend_name() == "snowflake" else {}
+session_manager = get_session_manager(sf_options)
+
+def load_catalog():
+    with session_manager.lease() as session:
+        return load_fruit_options(session)
+
+# Fruit catalog is built once per process and shared by every rerun and browser session
+@st.cache_resource
+def get_fruit_catalog():
+    return FruitCatalog(load_catalog, ttl_seconds=600)
+
+fruit_catalog = get_fruit_catalog()
+
+# One pooled, cached SmoothieFroot client per process
+@st.cache_resource
+def get_nutrition_client():
+    return NutritionClient(max_workers=5, timeout=5.0, cache_path=".smoothiefroot_cache.json")
+
+nutrition_client = get_nutrition_client()
+
+# Fruits x nutrients matrix, refreshed in the background so reruns do not call SmoothieFroot;
+# the first page load does not wait for it (fruits it lacks are fetched directly below)
+@st.cache_resource
+def get_nutrition_matrix():
+    return NutritionMatrix(fruit_catalog, nutrition_client, refresh_seconds=3600).start()
+
+nutrition_matrix = get_nutrition_matrix()
+
+# Orders from every browser session are group-committed by one background writer
+@st.cache_resource
+def get_order_writer():
+    if encoding_enabled():
+        inserter = snowpark_inserter(session_manager, columns=ENCODED_ORDER_COLUMNS, expressions=ENCODED_ORDER_EXPRESSIONS)
+    else:
+        inserter = snowpark_inserter(session_manager)
+    return OrderWriter(inserter, max_batch=25, max_delay_ms=200)
+
+order_writer = get_order_writer()
 
 Ingredients_List = st.multiselect(
     "Chose Upto 5 Ingredients:",
-    my_dataframe,
+    fruit_catalog.names(),
     max_selections=5
 )
 
@@ -32,25 +76,71 @@ Ingredients_List = st.multiselect(
 if Ingredients_List:
     Ingredients_string=''
 
+    search_ons = {fruit: fruit_catalog.search_on(fruit) for fruit in Ingredients_List}
+    payloads = {fruit: nutrition_matrix.payload(fruit) for fruit in Ingredients_List}
+    loading = nutrition_matrix.missing(Ingredients_List)
+    if loading:
+        # Matrix is cold or behind the catalog: look these fruits up directly (pooled and cached)
+        nutrition_matrix.request_refresh()
+        fetched = nutrition_client.get_many([search_ons[fruit] for fruit in loading if search_ons[fruit]])
+        for fruit in loading:
+            payloads[fruit] = fetched.get(search_ons[fruit])
+
+    # Combined nutrition is one row-sum over the preloaded matrix
+    st.subheader("Your Smoothie's Nutrition")
+    st.dataframe(nutrition_matrix.totals(Ingredients_List, payloads).rename("Total").to_frame().T, use_container_width=True)
+
     for fruit_chosen in Ingredients_List:
         Ingredients_string += fruit_chosen +' '
         
-        search_on=pd_df.loc[pd_df['FRUIT_NAME'] == fruit_chosen, 'SEARCH_ON'].iloc[0]
         # st.write('The search value for ', fruit_chosen,' is ', search_on, '.')
         
         st.subheader(fruit_chosen + 'Nutrition Information')
-        smoothiefroot_response = requests.get("https://my.smoothiefroot.com/api/fruit/" + search_on)
-        sf_df=st.dataframe(data=smoothiefroot_response.json(), use_container_width=True)
+        if payloads[fruit_chosen] is None:
+            st.caption("Nutrition information is not available for this fruit.")
+            continue
+        sf_df=st.dataframe(data=payloads[fruit_chosen], use_container_width=True)
+        if fruit_chosen not in loading:
+            st.caption("From the preloaded nutrition matrix")
+        elif nutrition_client.latencies_ms.get(search_ons[fruit_chosen]):
+            st.caption(f"Lookup took {nutrition_client.latencies_ms[search_ons[fruit_chosen]]:.0f} ms")
+        else:
+            st.caption("From the nutrition cache")
 
 
     
-    my_insert_stmt = """ insert into smoothies.public.orders(ingredients,NAME_ON_ORDER)
-            values ('""" + Ingredients_string + """','"""+name_on_order+"""')"""
-    # st.write(my_insert_stmt)
     time_to_insert = st.button('Submit order')
     
     if time_to_insert:
-        session.sql(my_insert_stmt).collect()
-        st.success(f'Your Smoothie is ordered, {name_on_order}', icon="✅")
+        # Wait for this order's own confirmation from the batched insert
+        order = None
+        if encoding_enabled():
+            # Compact mode: FRUIT_IDs only, the orders_decoded view rebuilds the text
+            try:
+                ingredient_ids, ingredient_mask = encode_ingredients(Ingredients_List, fruit_catalog)
+            except ValueError as e:
+                # A chosen fruit was removed from FRUIT_OPTIONS after the page loaded
+                st.error(f"Your order was not placed. {e}. Please choose your fruits again.")
+            else:
+                order = order_writer.submit(None, name_on_order, ingredient_ids, ingredient_mask)
+        else:
+            order = order_writer.submit(Ingredients_string, name_on_order)
+        if order is not None:
+            order.result(timeout=30)
+            st.success(f'Your Smoothie is ordered, {name_on_order}', icon="✅")
+
+# Catalog cache controls for the shop staff
+with st.sidebar.expander("Fruit catalog cache"):
+    st.write(fruit_catalog.stats())
+    if st.button("Reload fruit list"):
+        fruit_catalog.invalidate()
+        st.rerun()
 
+with st.sidebar.expander("Nutrition cache"):
+    st.write(nutrition_client.stats())
+    st.write(nutrition_matrix.stats())
+    if st.button("Refresh nutrition"):
+        nutrition_matrix.request_refresh()
 
+with st.sidebar.expander("Snowflake sessions"):
+    st.write(session_manager.stats())
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from entry_store import EntryStore
+
+STRESS_DB = "stress_entries.db"
+
+
+def save_entries(path, worker, threads, saves_each):
+    """Run in a worker process: `threads` operators each saving `saves_each` entries"""
+    store = EntryStore(path, excel_path=None)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def operator(number):
+        for i in range(saves_each):
+            entry = {
+                "Date": date.today(),
+                "Customer Name": f"stress-{worker}-{number}-{i}",
+                "Product Name": "Stress Test",
+                "Quantity": 1,
+                "Unit Price": 1.0,
+                "Total Price": 1.0,
+                "Status": "Pending",
+            }
+            started = time.perf_counter()
+            try:
+                store.append(entry)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    operators = [threading.Thread(target=operator, args=(n,)) for n in range(threads)]
+    for thread in operators:
+        thread.start()
+    for thread in operators:
+        thread.join()
+    return latencies, errors
+
+
+def run_stress(processes, threads, saves_each, path=STRESS_DB):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    store = EntryStore(path, excel_path=None)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(save_entries, [path] * processes, range(processes),
+                                [threads] * processes, [saves_each] * processes))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for worker_latencies, _ in results for ms in worker_latencies)
+    errors = [error for _, worker_errors in results for error in worker_errors]
+    expected = {f"stress-{w}-{t}-{i}" for w in range(processes) for t in range(threads) for i in range(saves_each)}
+    saved = store.load()["Customer Name"]
+
+    return {
+        "saves_attempted": len(expected),
+        "entries_saved": len(saved),
+        "lost": len(expected - set(saved)),
+        "duplicated": int(saved.duplicated().sum()),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "saves_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "save_ms": {
+            "p50": latencies[len(latencies) // 2] if latencies else None,
+            "p99": latencies[int(len(latencies) * 0.99)] if latencies else None,
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fire parallel saves at the data entry store and check none are lost")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=25, help="operators per process")
+    parser.add_argument("--saves", type=int, default=5, help="saves per operator")
+    parser.add_argument("--min-rate", type=float, default=50, help="fail below this many saves per second")
+    args = parser.parse_args()
+
+    results = run_stress(args.processes, args.threads, args.saves)
+    print(json.dumps(results, indent=2))
+    ok = (not results["lost"] and not results["duplicated"] and not results["errors"]
+          and results["saves_per_second"] >= args.min_rate)
+    print("PASS" if ok else "FAIL")
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,283 @@
+import argparse
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from collections import Counter
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORT_SCRIPT = "Python Script to Export_Dashboard_Names.py"
+
+# Any PAT is accepted by the stub
+TOKEN_NAME = "benchmark"
+TOKEN_VALUE = "benchmark-secret"
+
+
+def find(elements, label):
+    """The widget whose label starts with label"""
+    return next(element for element in elements if element.label.startswith(label))
+
+
+class TableauBenchmark:
+    """Runs the Tableau scripts' actions against tableau_stub and records time and REST calls per action"""
+
+    def __init__(self, stub, server_url, timeout):
+        self.stub = stub
+        self.handler = stub.RequestHandlerClass
+        self.server_url = server_url
+        self.timeout = timeout
+        self.results = []
+
+    def measure(self, script, action, step):
+        calls_before = Counter(self.handler.calls)
+        rate_limited_before = self.handler.rate_limited
+        started = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            error = f"{type(e).__name__}: {' '.join(str(e).split())}"
+        seconds = time.perf_counter() - started
+        calls = Counter(self.handler.calls)
+        calls.subtract(calls_before)
+        calls = +calls
+        result = {
+            "Script": script,
+            "Action": action,
+            "Seconds": round(seconds, 3),
+            "REST calls": sum(calls.values()),
+            "Sign-ins": calls["POST /auth/signin"],
+            "429s": self.handler.rate_limited - rate_limited_before,
+            "Top routes": ", ".join(f"{route} x{count}" for route, count in calls.most_common(3)),
+            "Error": error,
+        }
+        print(f"{script}: {action}: {result['Seconds']}s, {result['REST calls']} calls"
+              + (f" ({error})" if error else ""), flush=True)
+        self.results.append(result)
+        return result
+
+    # Streamlit apps, driven with AppTest like a user session
+
+    def app(self, script, url_label="Enter Tableau Server URL", token_label="Enter your Tableau Personal Access Token"):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(os.path.join(REPO_DIR, script), default_timeout=self.timeout).run()
+        find(at.text_input, f"{token_label} Name").input(TOKEN_NAME)
+        find(at.text_input, f"{token_label} Value").input(TOKEN_VALUE)
+        find(at.text_input, url_label).input(self.server_url)
+        return at.run()
+
+    @staticmethod
+    def click(at, label):
+        at = find(at.button, label).click().run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        if at.error:
+            raise RuntimeError(at.error[0].value)
+        return at
+
+    @staticmethod
+    def download(at, export_format):
+        """Click the Content Info download the way a browser does and return the file's bytes.
+
+        AppTest's click() does not run a download button's deferred `data`
+        callable, and its media file manager only lives for one run, so keep the
+        manager that registered the callable and execute it like the server does.
+        """
+        from unittest import mock
+
+        from streamlit.runtime.media_file_manager import MediaFileManager
+
+        managers = {}
+        add_deferred = MediaFileManager.add_deferred
+
+        def recording(manager, *args, **kwargs):
+            file_id = add_deferred(manager, *args, **kwargs)
+            managers[file_id] = manager
+            return file_id
+
+        with mock.patch.object(MediaFileManager, "add_deferred", recording):
+            find(at.radio, "Choose export format").set_value(export_format).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        file_id = find(at.download_button, "Download").proto.deferred_file_id
+        manager = managers[file_id]
+        url = manager.execute_deferred(file_id)
+        return manager._storage.get_file(url.rsplit("/", 1)[-1]).content
+
+    def run_tableau_app(self):
+        script = "Tableau_app.py"
+        site = self.stub.RequestHandlerClass.site
+        at = self.app(script)
+        self.measure(script, "Content Info: first refresh", lambda: self.click(at, "Refresh from Tableau"))
+
+        changed = max(1, len(site.listings["workbooks"]) // 100)
+        site.touch("workbooks", changed)
+        site.touch("views", changed)
+        self.measure(script, f"Content Info: refresh after {changed} workbooks/views changed",
+                     lambda: self.click(at, "Refresh from Tableau"))
+
+        def filter_and_export():
+            find(at.multiselect, "Type").set_value(["Workbook"]).run()
+            find(at.radio, "Choose export format").set_value("CSV").run()
+
+        self.measure(script, "Content Info: filter and change export format", filter_and_export)
+
+        import pandas as pd
+
+        readers = {"Excel": pd.read_excel, "CSV": pd.read_csv, "Parquet": pd.read_parquet}
+
+        def download(export_format):
+            content = self.download(at, export_format)
+            exported = readers[export_format](io.BytesIO(content))
+            expected = len(site.listings["workbooks"])
+            if list(exported.columns) != ["ID", "Name", "Type"] or len(exported) != expected:
+                raise RuntimeError(f"{export_format} download has {exported.shape}, expected {expected} workbook rows")
+
+        for export_format in readers:
+            self.measure(script, f"Content Info: download {export_format}", lambda: download(export_format))
+
+        def create_project():
+            find(at.selectbox, "Select an option").set_value("Create Project").run()
+            find(at.text_input, "Enter the Project Name").input(f"Benchmark project {time.time_ns()}")
+            find(at.text_area, "Enter Project Description").input("Created by tableau_benchmark.py")
+            self.click(at, "Create Project")
+
+        self.measure(script, "Create Project", create_project)
+
+        def create_group():
+            find(at.selectbox, "Select an option").set_value("Create Group").run()
+            find(at.text_input, "Enter the Group Name").input(f"Benchmark group {time.time_ns()}")
+            self.click(at, "Create Group")
+
+        self.measure(script, "Create Group", create_group)
+
+    def run_tableau_app_wip(self):
+        script = "Tableau_app_wip.py"
+        site = self.stub.RequestHandlerClass.site
+        at = self.app(script)
+        self.measure(script, "Content Info", lambda: self.click(at, "Connect to Tableau and Fetch Content Info"))
+
+        def download_workbook():
+            find(at.radio, "Select an option").set_value("Download Workbook").run()
+            find(at.text_input, "Enter the workbook ID").input(site.listings["workbooks"][0]["attrs"]["id"])
+            self.click(at, "Download Workbook to Local Machine")
+
+        self.measure(script, "Download Workbook", download_workbook)
+
+        def create_project():
+            find(at.radio, "Select an option").set_value("Create Project").run()
+            find(at.text_input, "Enter the new project name").input(f"Benchmark project {time.time_ns()}")
+            self.click(at, "Create Project")
+
+        self.measure(script, "Create Project", create_project)
+
+    def run_db_refresh(self):
+        script = "DB_refresh.py"
+        site = self.stub.RequestHandlerClass.site
+        at = self.app(script)
+        find(at.text_input, "Enter the Data Source ID").input(site.listings["datasources"][0]["attrs"]["id"])
+        self.measure(script, "Refresh extract", lambda: self.click(at, "Refresh Data Source Extract"))
+        self.measure(script, "Refresh extract again", lambda: self.click(at, "Refresh Data Source Extract"))
+
+    def run_schedule(self):
+        script = "Schedule.py"
+        at = self.app(script, url_label="Tableau Server URL", token_label="Tableau Personal Access Token")
+        find(at.text_input, "Tableau Site ID").input("benchmark")
+        find(at.selectbox, "Select Schedule Type").set_value("Hourly")
+        self.measure(script, "Create Hourly schedule", lambda: self.click(at.run(), "Create Schedule"))
+
+    # Command-line scripts
+
+    def run_export_script(self, mapping):
+        import tableauserverclient as TSC
+
+        spec = importlib.util.spec_from_file_location("export_dashboard_names", os.path.join(REPO_DIR, EXPORT_SCRIPT))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        # Point the script's module-level connection settings at the stub
+        module.server = TSC.Server(self.server_url, use_server_version=True)
+        module.tableau_auth = TSC.PersonalAccessTokenAuth(TOKEN_NAME, TOKEN_VALUE, site_id="")
+        self.measure(EXPORT_SCRIPT, f"Export ({mapping} mapping, CSV)",
+                     lambda: module.export_dashboard_data("tableau_export.csv", "csv", mapping))
+
+    def run_publish(self):
+        import tableauserverclient as TSC
+
+        # The Publish Workbook pages need st.file_uploader, which AppTest cannot drive;
+        # this is the tableauserverclient call they end in
+        with zipfile.ZipFile("benchmark.twbx", "w") as archive:
+            archive.writestr("benchmark.twb", "<workbook/>")
+        project_id = self.stub.RequestHandlerClass.site.listings["projects"][0]["attrs"]["id"]
+
+        def publish():
+            server = TSC.Server(self.server_url, use_server_version=True)
+            with server.auth.sign_in(TSC.PersonalAccessTokenAuth(TOKEN_NAME, TOKEN_VALUE, site_id="")):
+                server.workbooks.publish(TSC.WorkbookItem(project_id, name="Benchmark"), "benchmark.twbx",
+                                         TSC.Server.PublishMode.Overwrite)
+
+        self.measure("Publish Workbook pages", "Publish workbook (tableauserverclient)", publish)
+
+
+def run_benchmark(items, latency, rate_limit_every, retry_after, token_ttl, timeout, mapping):
+    sys.path.insert(0, REPO_DIR)
+    from tableau_stub import start_stub_server
+
+    stub, server_url = start_stub_server(items=items, latency=latency, rate_limit_every=rate_limit_every,
+                                         retry_after=retry_after, token_ttl=token_ttl)
+    benchmark = TableauBenchmark(stub, server_url, timeout)
+    started = time.perf_counter()
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="tableau_benchmark_") as scratch:
+        # Catalog databases, downloads and exports go to a scratch directory
+        os.chdir(scratch)
+        try:
+            benchmark.run_tableau_app()
+            benchmark.run_tableau_app_wip()
+            benchmark.run_db_refresh()
+            benchmark.run_schedule()
+            benchmark.run_export_script(mapping)
+            benchmark.run_publish()
+        finally:
+            os.chdir(workdir)
+    stub.shutdown()
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "items": items,
+        "latency_seconds": latency,
+        "rate_limit_every": rate_limit_every,
+        "token_ttl_seconds": token_ttl,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "rest_calls": stub.RequestHandlerClass.requests_served,
+        "actions": benchmark.results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the Tableau scripts' actions against the local REST stub")
+    parser.add_argument("--items", type=int, default=10_000, help="total items on the stub site")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub delay per request in seconds")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-ttl", type=float, default=None, help="seconds a sign-in token stays valid")
+    parser.add_argument("--mapping", choices=("all-users", "owner"), default="owner",
+                        help="row mapping for the dashboard export script")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per app rerun")
+    parser.add_argument("--output", default="tableau_benchmark_results.json")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.items, args.latency, args.rate_limit_every, args.retry_after, args.token_ttl,
+                            args.timeout, args.mapping)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    import pandas as pd
+
+    print(pd.DataFrame(results["actions"]).drop(columns="Top routes").to_string(index=False))
+    print(f"{results['rest_calls']} REST calls in {results['elapsed_seconds']}s; results written to {args.output}")
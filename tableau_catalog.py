@@ -0,0 +1,226 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+import tableauserverclient as TSC
+
+from tableau_inventory import ENDPOINTS, PAGE_SIZE, fetch_all
+
+CATALOG_DB = "tableau_catalog.db"
+
+# Listings whose items carry updatedAt and can be fetched incrementally. Users and
+# projects have no updatedAt in the REST API / TSC, so they are re-listed on every sync.
+INCREMENTAL_KINDS = ("workbooks", "datasources", "views", "flows")
+
+# How often a full listing runs to drop items deleted on the server
+RECONCILE_SECONDS = 24 * 3600
+
+SCHEMA = """
+create table if not exists items (
+    site text not null,
+    kind text not null,
+    id text not null,
+    name text,
+    project_id text,
+    project_name text,
+    owner_id text,
+    workbook_id text,
+    created_at text,
+    updated_at text,
+    primary key (site, kind, id)
+);
+create table if not exists sync_state (
+    site text not null,
+    kind text not null,
+    watermark text,
+    last_full_sync real,
+    last_sync real,
+    primary key (site, kind)
+);
+"""
+
+ITEM_COLUMNS = ("id", "name", "project_id", "project_name", "owner_id", "workbook_id", "created_at", "updated_at")
+
+
+def site_key(server_url, site_id, user_id):
+    """Catalog key for a Tableau site as seen by one signed-in user (listings depend on their permissions)"""
+    return f"{server_url.rstrip('/').lower()}#{site_id or ''}#{user_id}"
+
+
+def _iso(value):
+    """UTC ISO-8601 text for a datetime (as the REST API filters expect), else None"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def item_row(item):
+    """Tuple in ITEM_COLUMNS order for any TSC item"""
+    return (
+        item.id,
+        getattr(item, "name", None),
+        getattr(item, "project_id", None) or getattr(item, "parent_id", None),
+        getattr(item, "project_name", None),
+        getattr(item, "owner_id", None),
+        getattr(item, "workbook_id", None),
+        _iso(getattr(item, "created_at", None)),
+        _iso(getattr(item, "updated_at", None)),
+    )
+
+
+class ContentCatalog:
+    """Local SQLite copy of a site's content, kept current by incremental syncs.
+
+    The first sync of a listing is a full load. After that, workbooks,
+    datasources, views and flows are fetched with an `updatedAt >= watermark`
+    filter, so a sync only transfers what changed. Once every
+    RECONCILE_SECONDS a listing is fetched in full and items that no longer
+    exist on the server are removed.
+    """
+
+    def __init__(self, site, path=CATALOG_DB):
+        self.site = site
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("pragma journal_mode = wal")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _state(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "select kind, watermark, last_full_sync from sync_state where site = ?", (self.site,)
+            ).fetchall()
+        return {kind: (watermark, last_full_sync) for kind, watermark, last_full_sync in rows}
+
+    def _fetch(self, server, kind, watermark, full, page_size):
+        started = time.perf_counter()
+        options = TSC.RequestOptions(pagesize=page_size)
+        if not full:
+            options.filter.add(TSC.Filter(TSC.RequestOptions.Field.UpdatedAt,
+                                          TSC.RequestOptions.Operator.GreaterThanOrEqual, watermark))
+        try:
+            rows, error = [item_row(item) for item in
+                           fetch_all(getattr(server, ENDPOINTS[kind][0]), request_options=options)], None
+        except Exception as e:
+            # Leave this listing as it was (e.g. flows on a site without Prep); sync the rest
+            rows, error = None, str(e)
+        return kind, full, rows, error, time.perf_counter() - started
+
+    def sync(self, server, kinds=tuple(ENDPOINTS), force_full=False,
+             reconcile_seconds=RECONCILE_SECONDS, page_size=PAGE_SIZE, max_workers=4):
+        """Bring the catalog up to date; call inside a signed-in `server.auth.sign_in(...)` block.
+
+        Returns a DataFrame with, per listing: mode (full/incremental/failed),
+        items fetched, items deleted, seconds spent and any error.
+        """
+        state = self._state()
+        now = time.time()
+        plan = []
+        for kind in kinds:
+            watermark, last_full_sync = state.get(kind, (None, None))
+            full = (force_full or kind not in INCREMENTAL_KINDS or not watermark
+                    or now - (last_full_sync or 0) > reconcile_seconds)
+            plan.append((kind, watermark, full))
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tableau-catalog") as pool:
+            results = list(pool.map(lambda step: self._fetch(server, *step, page_size), plan))
+
+        report = []
+        placeholders = ", ".join("?" for _ in ITEM_COLUMNS)
+        with closing(self._connect()) as conn, conn:
+            for kind, full, rows, error, seconds in results:
+                if error is not None:
+                    report.append({"Endpoint": kind, "Mode": "failed", "Fetched": 0, "Deleted": 0,
+                                   "Seconds": round(seconds, 3), "Error": error})
+                    continue
+                deleted = 0
+                if full:
+                    # Full listing: anything we hold that the server no longer returned was deleted
+                    conn.execute("create temp table if not exists listed (id text primary key)")
+                    conn.execute("delete from listed")
+                    conn.executemany("insert or ignore into listed values (?)", [(row[0],) for row in rows])
+                    deleted = conn.execute(
+                        "delete from items where site = ? and kind = ? and id not in (select id from listed)",
+                        (self.site, kind),
+                    ).rowcount
+                conn.executemany(
+                    f"insert or replace into items (site, kind, {', '.join(ITEM_COLUMNS)}) "
+                    f"values (?, ?, {placeholders})",
+                    [(self.site, kind) + row for row in rows],
+                )
+                stamps = [stamp for row in rows for stamp in row[-2:] if stamp]
+                conn.execute(
+                    """insert into sync_state (site, kind, watermark, last_full_sync, last_sync)
+                       values (?, ?, ?, ?, ?)
+                       on conflict (site, kind) do update set
+                           watermark = max(coalesce(watermark, ''), coalesce(excluded.watermark, '')),
+                           last_full_sync = coalesce(excluded.last_full_sync, last_full_sync),
+                           last_sync = excluded.last_sync""",
+                    (self.site, kind, max(stamps) if stamps else None, now if full else None, now),
+                )
+                report.append({
+                    "Endpoint": kind,
+                    "Mode": "full" if full else "incremental",
+                    "Fetched": len(rows),
+                    "Deleted": deleted,
+                    "Seconds": round(seconds, 3),
+                    "Error": None,
+                })
+        return pd.DataFrame(report)
+
+    def frame(self, kinds=tuple(ENDPOINTS)):
+        """ID / Name / Type table of the cataloged items (the Content Info layout)"""
+        labels = {kind: ENDPOINTS[kind][1] for kind in kinds}
+        placeholders = ", ".join("?" for _ in labels)
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(
+                f'select id as "ID", name as "Name", kind from items '
+                f"where site = ? and kind in ({placeholders}) order by kind, name",
+                conn, params=(self.site, *labels),
+            )
+        df["Type"] = df.pop("kind").map(labels)
+        return df
+
+    def iter_rows(self, kinds=tuple(ENDPOINTS), chunk_rows=50_000):
+        """The frame() rows as lists of (ID, Name, Type) tuples, read from a cursor chunk_rows at a time"""
+        labels = {kind: ENDPOINTS[kind][1] for kind in kinds}
+        placeholders = ", ".join("?" for _ in labels)
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"select id, name, kind from items where site = ? and kind in ({placeholders}) order by kind, name",
+                (self.site, *labels),
+            )
+            while chunk := cursor.fetchmany(chunk_rows):
+                yield [(item_id, name, labels[kind]) for item_id, name, kind in chunk]
+
+    def items(self, kind):
+        """All stored columns for one listing"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                f"select {', '.join(ITEM_COLUMNS)} from items where site = ? and kind = ? order by name",
+                conn, params=(self.site, kind),
+            )
+
+    def fingerprint(self):
+        """Text that changes whenever a sync of this site changes the catalog (cheap to compute)"""
+        with closing(self._connect()) as conn:
+            synced = conn.execute(
+                "select group_concat(kind || ':' || coalesce(watermark, '') || ':' || last_sync, '|') "
+                "from (select kind, watermark, last_sync from sync_state where site = ? order by kind)",
+                (self.site,),
+            ).fetchone()[0]
+            count = conn.execute("select count(*) from items where site = ?", (self.site,)).fetchone()[0]
+        return f"{self.site}|{count}|{synced or ''}"
+
+    def last_sync(self):
+        """Unix time of the most recent sync of this site, or None if never synced"""
+        with closing(self._connect()) as conn:
+            return conn.execute("select max(last_sync) from sync_state where site = ?", (self.site,)).fetchone()[0]
@@ -0,0 +1,221 @@
+import argparse
+import csv
+import io
+import multiprocessing
+import sys
+import tempfile
+import time
+
+# Rows encoded / written per step
+CHUNK_ROWS = 50_000
+
+# Worksheet limit in Excel, header row included; longer exports continue on another sheet
+EXCEL_MAX_ROWS = 1_048_576
+
+# Export format label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Lists of row tuples from a DataFrame, chunk_rows at a time"""
+    for start in range(0, len(df), chunk_rows):
+        yield list(df.iloc[start:start + chunk_rows].itertuples(index=False, name=None))
+
+
+def write_csv(file, columns, chunks):
+    """UTF-8 CSV into a binary file, encoding one chunk at a time"""
+    rows = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        file.write(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+        rows += len(chunk)
+    file.write(buffer.getvalue().encode("utf-8"))
+    return rows
+
+
+def write_xlsx(file, columns, chunks, sheet_name="Tableau Data"):
+    """Excel workbook written by xlsxwriter in constant_memory mode (rows are flushed as they go)"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(file, {"constant_memory": True})
+    rows = 0
+    sheets = 0
+    worksheet, row_index = None, EXCEL_MAX_ROWS
+    for chunk in chunks:
+        for row in chunk:
+            if row_index == EXCEL_MAX_ROWS:
+                sheets += 1
+                worksheet = workbook.add_worksheet(sheet_name if sheets == 1 else f"{sheet_name} ({sheets})")
+                worksheet.write_row(0, 0, columns)
+                row_index = 1
+            worksheet.write_row(row_index, 0, row)
+            row_index += 1
+        rows += len(chunk)
+    if worksheet is None:
+        workbook.add_worksheet(sheet_name).write_row(0, 0, columns)
+    workbook.close()
+    return rows
+
+
+def write_parquet(file, columns, chunks):
+    """Parquet file with one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_arrays([pa.array(column) for column in zip(*chunk)], names=list(columns))
+            if writer is None:
+                # All-null columns in the first chunk would infer a null type; store those as text
+                schema = pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                                    for field in table.schema])
+                writer = pq.ParquetWriter(file, schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+        if writer is None:
+            writer = pq.ParquetWriter(file, pa.schema([(name, pa.string()) for name in columns]))
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}
+
+
+def export_file(extension, columns, chunks):
+    """Write the export to an anonymous temporary file and return it rewound for reading"""
+    file = tempfile.TemporaryFile()
+    try:
+        WRITERS[extension](file, columns, chunks)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file
+
+
+def export_bytes(extension, columns, chunks):
+    """The finished export file's contents; the temporary file it is written to is closed (and deleted)"""
+    with export_file(extension, columns, chunks) as file:
+        return file.read()
+
+
+def download_args(export_format, columns, make_chunks, file_name="tableau_data"):
+    """Keyword arguments for st.download_button that export only when clicked.
+
+    Streamlit calls `data` on click. The rows are written to a temporary file
+    chunk by chunk, so only the finished file (compressed, for Excel and
+    Parquet) is held in memory, not a DataFrame-sized intermediate copy.
+    Streamlit keeps that payload in memory to serve it.
+    """
+    extension, mime = EXPORT_FORMATS[export_format]
+    return {
+        "data": lambda: export_bytes(extension, columns, make_chunks()),
+        "file_name": f"{file_name}.{extension}",
+        "mime": mime,
+    }
+
+
+# Benchmark: peak RSS of exporting a synthetic inventory, each run in a fresh process
+
+BENCHMARK_COLUMNS = ("ID", "Name", "Type")
+BENCHMARK_TYPES = ("Workbook", "View", "Datasource", "Project", "User", "Flow")
+
+
+def synthetic_rows(count):
+    for i in range(count):
+        yield f"{i:08x}-4e2b-4c1d-9a7f-{i:012x}", f"Item {i} of the inventory", BENCHMARK_TYPES[i % 6]
+
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _benchmark_run(method, extension, rows, chunk_rows, results):
+    import pandas as pd  # imported up front so library size is not counted as export memory
+    import pyarrow.parquet  # noqa: F401
+    import xlsxwriter  # noqa: F401
+
+    before = _peak_rss_mb()
+    started = time.perf_counter()
+    if method == "streaming":
+        def chunks():
+            chunk = []
+            for row in synthetic_rows(rows):
+                chunk.append(row)
+                if len(chunk) == chunk_rows:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        with export_file(extension, BENCHMARK_COLUMNS, chunks()) as file:
+            size = file.seek(0, io.SEEK_END)
+    else:
+        # What the app did before: a DataFrame exported whole into memory
+        df = pd.DataFrame(synthetic_rows(rows), columns=list(BENCHMARK_COLUMNS))
+        if extension == "xlsx":
+            output = io.BytesIO()
+            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+                df.to_excel(writer, index=False, sheet_name="Tableau Data")
+            size = len(output.getvalue())
+        elif extension == "csv":
+            size = len(df.to_csv(index=False).encode())
+        else:
+            output = io.BytesIO()
+            df.to_parquet(output, index=False)
+            size = len(output.getvalue())
+    results.put({
+        "Method": method,
+        "Format": extension,
+        "Rows": rows,
+        "Seconds": round(time.perf_counter() - started, 2),
+        "File MB": round(size / (1 << 20), 1),
+        "Baseline RSS MB": round(before, 1),
+        "Peak RSS MB": round(_peak_rss_mb(), 1),
+    })
+
+
+def benchmark(rows=1_000_000, formats=tuple(WRITERS), methods=("in-memory", "streaming"), chunk_rows=CHUNK_ROWS):
+    context = multiprocessing.get_context("spawn")
+    report = []
+    for extension in formats:
+        for method in methods:
+            results = context.Queue()
+            process = context.Process(target=_benchmark_run, args=(method, extension, rows, chunk_rows, results))
+            process.start()
+            result = results.get()
+            process.join()
+            result["Export RSS MB"] = round(result["Peak RSS MB"] - result["Baseline RSS MB"], 1)
+            print(result, flush=True)
+            report.append(result)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Peak memory of in-memory vs streaming inventory exports")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", choices=tuple(WRITERS), default=list(WRITERS))
+    parser.add_argument("--methods", nargs="+", choices=("in-memory", "streaming"), default=["in-memory", "streaming"])
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    print(pd.DataFrame(benchmark(args.rows, args.formats, args.methods, args.chunk_rows)).to_string(index=False))
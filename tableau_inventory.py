@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import tableauserverclient as TSC
+
+# Largest page size Tableau's REST API accepts
+PAGE_SIZE = 1000
+
+# IDs per request when looking items up with an "id in [...]" filter (keeps the URL short)
+ID_BATCH_SIZE = 100
+
+# Listing name -> (Server endpoint attribute, label used in the Type column)
+ENDPOINTS = {
+    "users": ("users", "User"),
+    "datasources": ("datasources", "Datasource"),
+    "workbooks": ("workbooks", "Workbook"),
+    "projects": ("projects", "Project"),
+    "views": ("views", "View"),
+    "flows": ("flows", "Flow"),
+}
+
+
+def fetch_all(endpoint, page_size=PAGE_SIZE, request_options=None):
+    """Every item of a listing endpoint, following pagination to the last page"""
+    options = request_options or TSC.RequestOptions(pagesize=page_size)
+    return list(TSC.Pager(endpoint, options))
+
+
+def fetch_by_ids(endpoint, ids, batch_size=ID_BATCH_SIZE, page_size=PAGE_SIZE):
+    """Items with the given IDs, looked up batch_size at a time with an `id in` filter"""
+    ids = sorted(set(ids))
+    items = []
+    for start in range(0, len(ids), batch_size):
+        options = TSC.RequestOptions(pagesize=page_size)
+        options.filter.add(TSC.Filter(TSC.RequestOptions.Field.Id, TSC.RequestOptions.Operator.In,
+                                      ids[start:start + batch_size]))
+        items.extend(fetch_all(endpoint, request_options=options))
+    return items
+
+
+def _timed_fetch(server, name, page_size):
+    attribute, _ = ENDPOINTS[name]
+    started = time.perf_counter()
+    items, error = [], None
+    try:
+        items = fetch_all(getattr(server, attribute), page_size)
+    except Exception as e:
+        # One failing listing (e.g. flows on a site without Prep) should not hide the others
+        error = str(e)
+    return name, items, {
+        "Endpoint": name,
+        "Items": len(items),
+        "Pages": max(1, -(-len(items) // page_size)),
+        "Seconds": round(time.perf_counter() - started, 3),
+        "Error": error,
+    }
+
+
+def fetch_inventory(server, endpoints=tuple(ENDPOINTS), page_size=PAGE_SIZE, max_workers=4):
+    """Fetch several listings concurrently on a bounded thread pool.
+
+    Must be called inside a signed-in `server.auth.sign_in(...)` block. Returns
+    ({listing name: [items]}, per-endpoint timing DataFrame).
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tableau-inventory") as pool:
+        results = list(pool.map(lambda name: _timed_fetch(server, name, page_size), endpoints))
+    items = {name: listing for name, listing, _ in results}
+    timings = pd.DataFrame([timing for _, _, timing in results])
+    return items, timings
+
+
+def inventory_frame(items):
+    """One ID / Name / Type table for everything in an inventory"""
+    frames = [
+        pd.DataFrame([(item.id, item.name) for item in listing], columns=["ID", "Name"]).assign(Type=ENDPOINTS[name][1])
+        for name, listing in items.items()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["ID", "Name", "Type"])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+import time
+
+import requests
+import tableauserverclient as TSC
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tableauserverclient.server.endpoint.exceptions import NotSignedInError, ServerResponseError
+
+# Re-sign-in before the server would expire the token (Tableau Cloud/Server default is 240 minutes)
+SESSION_TTL_SECONDS = 3 * 3600
+
+# Times a request answered with 429 Too Many Requests is sent again, after the Retry-After wait
+RATE_LIMIT_RETRIES = 5
+
+# One urllib3 connection pool shared by every Tableau server object in the process.
+# Each server still gets its own requests.Session, so cookies and auth never mix.
+_ADAPTER = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    # A 429 means the request was not processed, so POSTs are retried too
+    max_retries=Retry(total=RATE_LIMIT_RETRIES, connect=0, read=False, status_forcelist=(429,),
+                      allowed_methods=None, respect_retry_after_header=True, raise_on_status=False),
+)
+
+
+def pooled_session():
+    session = requests.Session()
+    session.mount("https://", _ADAPTER)
+    session.mount("http://", _ADAPTER)
+    return session
+
+
+def auth_identity(tableau_auth):
+    """(PAT name or username, fingerprint of the secret) for a TSC auth object"""
+    name = getattr(tableau_auth, "token_name", None) or getattr(tableau_auth, "username", None)
+    secret = getattr(tableau_auth, "personal_access_token", None) or getattr(tableau_auth, "password", None) or ""
+    return name, hashlib.sha256(secret.encode()).hexdigest()
+
+
+def is_auth_failure(error):
+    """True for the errors Tableau raises once a token has expired or been revoked"""
+    if isinstance(error, NotSignedInError):
+        return True
+    return isinstance(error, ServerResponseError) and str(error.code).startswith("401")
+
+
+class TableauSessions:
+    """Signed-in TSC.Server objects kept for reuse, keyed by server URL, site,
+    PAT name/username and the server options (http_options, use_server_version).
+
+    Actions, writes included, reuse the auth token until SESSION_TTL_SECONDS
+    have passed; the expiring token is signed out when it is replaced. An
+    action that fails with a 401 signs in again and is retried once (Tableau
+    rejects an unauthenticated request before acting on it). Keep one
+    instance per user session (e.g. in st.session_state).
+    """
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._servers = {}
+        self._lock = threading.Lock()
+        self.sign_ins = 0
+        self.reauths = 0
+        self.actions = 0
+
+    def _sign_in(self, server, tableau_auth):
+        server.auth.sign_in(tableau_auth)
+        self.sign_ins += 1
+        return time.monotonic() + self.ttl_seconds
+
+    def server(self, server_url, site_id, tableau_auth, http_options=None, use_server_version=True):
+        """A signed-in TSC.Server for these credentials, signing in only when needed"""
+        name, fingerprint = auth_identity(tableau_auth)
+        options = tuple(sorted((option, repr(value)) for option, value in (http_options or {}).items()))
+        key = (server_url.rstrip("/").lower(), site_id or "", name, options, use_server_version)
+        with self._lock:
+            entry = self._servers.get(key)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                server = TSC.Server(server_url, use_server_version=False, http_options=http_options,
+                                    session_factory=pooled_session)
+                if use_server_version:
+                    server.use_server_version()
+                entry = {"server": server, "auth": tableau_auth, "fingerprint": fingerprint, "expires_at": 0.0}
+                self._servers[key] = entry
+            if time.monotonic() >= entry["expires_at"] or not entry["server"].is_signed_in():
+                if entry["server"].is_signed_in():
+                    # Do not leave the replaced token open on the server
+                    try:
+                        entry["server"].auth.sign_out()
+                    except Exception:
+                        pass
+                entry["expires_at"] = self._sign_in(entry["server"], tableau_auth)
+            return entry["server"]
+
+    def run(self, server_url, site_id, tableau_auth, action, **server_options):
+        """Call action(server) with a signed-in server; on a 401, sign in again and retry once"""
+        server = self.server(server_url, site_id, tableau_auth, **server_options)
+        self.actions += 1
+        try:
+            return action(server)
+        except Exception as e:
+            if not is_auth_failure(e):
+                raise
+        with self._lock:
+            self.reauths += 1
+            entry = next((entry for entry in self._servers.values() if entry["server"] is server), None)
+            if entry is not None:
+                entry["expires_at"] = self._sign_in(server, tableau_auth)
+        if entry is None:
+            # Signed out meanwhile (sign_out_all); start over with a new server
+            server = self.server(server_url, site_id, tableau_auth, **server_options)
+        return action(server)
+
+    def sign_out_all(self):
+        with self._lock:
+            for entry in self._servers.values():
+                try:
+                    entry["server"].auth.sign_out()
+                except Exception:
+                    pass
+            self._servers.clear()
+
+    def stats(self):
+        return {
+            "sign_ins": self.sign_ins,
+            "reauths": self.reauths,
+            "actions": self.actions,
+            "signed_in_servers": len(self._servers),
+        }
+
+
+def get_tableau_sessions(session_state):
+    """The TableauSessions for this Streamlit user session (created on first use)"""
+    if "tableau_sessions" not in session_state:
+        session_state["tableau_sessions"] = TableauSessions()
+    return session_state["tableau_sessions"]
@@ -0,0 +1,449 @@
+import argparse
+import re
+import secrets
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+# REST API version reported by serverInfo (Tableau 2024.3)
+REST_API_VERSION = "3.24"
+
+# Largest pageSize Tableau accepts; larger requests get a 400 like the real server
+MAX_PAGE_SIZE = 1000
+
+# Share of a site's items per listing
+SITE_SHARES = {
+    "users": 0.10,
+    "groups": 0.01,
+    "projects": 0.02,
+    "workbooks": 0.20,
+    "datasources": 0.10,
+    "views": 0.50,
+    "flows": 0.07,
+}
+
+# Listing -> XML element name
+TAGS = {
+    "users": "user",
+    "groups": "group",
+    "projects": "project",
+    "workbooks": "workbook",
+    "datasources": "datasource",
+    "views": "view",
+    "flows": "flow",
+    "schedules": "schedule",
+    "jobs": "job",
+}
+
+# Filter field -> item attribute
+FILTER_FIELDS = {"id": "id", "name": "name", "createdAt": "createdAt", "updatedAt": "updatedAt"}
+
+CREATED_BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _stamp(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _now():
+    return _stamp(datetime.now(timezone.utc))
+
+
+def _item(kind, attrs, children=()):
+    """Stored item: XML attributes plus (tag, attributes) child elements"""
+    return {"kind": kind, "attrs": attrs, "children": tuple(children)}
+
+
+def render(item):
+    attrs = "".join(f" {key}={quoteattr(str(value))}" for key, value in item["attrs"].items() if value is not None)
+    children = "".join(
+        f"<{tag}" + "".join(f" {key}={quoteattr(str(value))}" for key, value in child.items()) + "/>"
+        for tag, child in item["children"]
+    )
+    return f"<{TAGS[item['kind']]}{attrs}>{children}</{TAGS[item['kind']]}>"
+
+
+def response(body=""):
+    return f'<?xml version="1.0" encoding="UTF-8"?><tsResponse xmlns="http://tableau.com/api">{body}</tsResponse>'
+
+
+def error_response(code, summary, detail=""):
+    return response(f'<error code="{code}"><summary>{escape(summary)}</summary><detail>{escape(detail)}</detail></error>')
+
+
+def parse_filter(expression):
+    """[(field, operator, value)] from a REST filter expression such as `name:eq:Sales,id:in:[a,b]`"""
+    terms = []
+    for term in re.findall(r"[^,\[]+(?:\[[^\]]*\])?", expression):
+        field, operator, value = term.strip(",").split(":", 2)
+        if value.startswith("["):
+            value = [part for part in value[1:-1].split(",") if part]
+        terms.append((field, operator, value))
+    return terms
+
+
+def matches(item, terms):
+    for field, operator, value in terms:
+        current = item["attrs"].get(FILTER_FIELDS[field])
+        if current is None:
+            return False
+        if operator == "eq" and current != value:
+            return False
+        if operator == "in" and current not in value:
+            return False
+        if operator == "gte" and not current >= value:
+            return False
+        if operator == "gt" and not current > value:
+            return False
+        if operator == "lte" and not current <= value:
+            return False
+        if operator == "lt" and not current < value:
+            return False
+    return True
+
+
+class StubError(Exception):
+    def __init__(self, status, code, summary, detail=""):
+        super().__init__(summary)
+        self.status = status
+        self.code = code
+        self.summary = summary
+        self.detail = detail
+
+
+class TableauSite:
+    """In-memory content of one stub site, with generated users, projects, workbooks, views, ..."""
+
+    def __init__(self, items=1000):
+        self.lock = threading.Lock()
+        self.site_id = str(uuid.UUID(int=1))
+        self.listings = {kind: [] for kind in TAGS}
+        self.by_id = {}
+        self.tokens = {}
+        self.memberships = set()
+        counts = {kind: max(1, round(items * share)) for kind, share in SITE_SHARES.items()}
+        for number, kind in enumerate(SITE_SHARES):
+            for i in range(counts[kind]):
+                self._add(self._generate(kind, number, i))
+
+    def _generate(self, kind, number, i):
+        item_id = str(uuid.UUID(int=(number + 2) << 64 | i))
+        created = CREATED_BASE + timedelta(minutes=i)
+        stamps = {"createdAt": _stamp(created), "updatedAt": _stamp(created + timedelta(days=1))}
+        users, projects = self.listings["users"], self.listings["projects"]
+        owner = ("owner", {"id": users[i % len(users)]["attrs"]["id"]}) if users else None
+        project = projects[i % len(projects)]["attrs"] if projects else None
+        if kind == "users":
+            return _item(kind, {"id": item_id, "name": f"user{i:06d}@example.com", "siteRole": "Explorer",
+                                "fullName": f"User {i}", "lastLogin": stamps["updatedAt"]})
+        if kind == "groups":
+            return _item(kind, {"id": item_id, "name": f"Group {i}"}, [("domain", {"name": "local"})])
+        if kind == "projects":
+            return _item(kind, {"id": item_id, "name": f"Project {i}", "description": "",
+                                "contentPermissions": "ManagedByOwner"})
+        if kind == "views":
+            workbook = self.listings["workbooks"][i % len(self.listings["workbooks"])]
+            return _item(kind, {"id": item_id, "name": f"Sheet {i}", "contentUrl": f"Workbook{i}/sheets/Sheet{i}",
+                                **stamps},
+                         [("workbook", {"id": workbook["attrs"]["id"]}), *workbook["children"]])
+        names = {"workbooks": "Workbook", "datasources": "Data Source", "flows": "Flow"}
+        attrs = {"id": item_id, "name": f"{names[kind]} {i}", "contentUrl": f"{names[kind].replace(' ', '')}{i}",
+                 "size": 1 + i % 50, **stamps}
+        if kind == "datasources":
+            attrs["type"] = "sqlserver"
+        return _item(kind, attrs, [("project", {"id": project["id"], "name": project["name"]}), owner])
+
+    def _add(self, item):
+        self.listings[item["kind"]].append(item)
+        self.by_id[(item["kind"], item["attrs"]["id"])] = item
+        return item
+
+    def get(self, kind, item_id):
+        item = self.by_id.get((kind, item_id))
+        if item is None:
+            raise StubError(404, "404000", "Resource Not Found", f"{TAGS[kind]} '{item_id}' could not be found.")
+        return item
+
+    def page(self, kind, page_number, page_size, expression):
+        terms = parse_filter(expression) if expression else []
+        unknown = [field for field, _, _ in terms if field not in FILTER_FIELDS]
+        if unknown:
+            raise StubError(400, "400065", "Bad Request", f"Filter field not supported by the stub: {unknown[0]}")
+        with self.lock:
+            listing = [item for item in self.listings[kind] if matches(item, terms)] if terms else self.listings[kind]
+            start = (page_number - 1) * page_size
+            return listing[start:start + page_size], len(listing)
+
+    def touch(self, kind, count):
+        """Mark the first count items of a listing as updated now (for incremental sync runs)"""
+        with self.lock:
+            stamp = _now()
+            for item in self.listings[kind][:count]:
+                item["attrs"]["updatedAt"] = stamp
+        return count
+
+    def create(self, kind, attrs, children=()):
+        with self.lock:
+            return self._add(_item(kind, {"id": str(uuid.uuid4()), **attrs}, children))
+
+    def find(self, kind, name, project_id=None):
+        for item in self.listings[kind]:
+            if item["attrs"]["name"] == name and (project_id is None or
+                                                  dict(item["children"]).get("project", {}).get("id") == project_id):
+                return item
+        return None
+
+
+class TableauStubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse pooled connections
+    protocol_version = "HTTP/1.1"
+
+    # Set by make_stub_server
+    site = None
+    latency = 0.0
+    max_page_size = MAX_PAGE_SIZE
+    rate_limit_every = 0
+    retry_after = 1
+    token_ttl = None
+    calls = Counter()
+    rate_limited = 0
+    requests_served = 0
+    _counter_lock = threading.Lock()
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        route = re.sub(r"^/api/[\d.]+", "", parts.path)
+        template = re.sub(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "/{id}",
+                          re.sub(r"^/sites/[^/]+", "/sites/{site}", route))
+
+        cls = type(self)
+        with self._counter_lock:
+            cls.requests_served += 1
+            cls.calls[f"{method} {template}"] += 1
+            throttled = self.rate_limit_every and cls.requests_served % self.rate_limit_every == 0
+            if throttled:
+                cls.rate_limited += 1
+        if throttled:
+            self._send(429, error_response("429000", "Too Many Requests", "Rate limit exceeded (stub)"),
+                       {"Retry-After": str(self.retry_after)})
+            return
+
+        try:
+            status, payload, headers = self._dispatch(method, route, query, body)
+        except StubError as e:
+            status, payload, headers = e.status, error_response(e.code, e.summary, e.detail), {}
+        self._send(status, payload, headers)
+
+    def _send(self, status, payload, headers=None):
+        data = payload if isinstance(payload, bytes) else payload.encode()
+        self.send_response(status)
+        content_type = (headers or {}).pop("Content-Type", "application/xml;charset=utf-8")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authenticate(self):
+        token = self.headers.get("X-Tableau-Auth")
+        expires_at = self.site.tokens.get(token, 0) if token else 0
+        if expires_at is None or (expires_at and expires_at > time.monotonic()):
+            return
+        raise StubError(401, "401002", "Unauthorized Access", "Invalid authentication credentials were provided.")
+
+    def _dispatch(self, method, route, query, body):
+        site = self.site
+        if route == "/serverInfo":
+            return 200, response(
+                f'<serverInfo><productVersion build="20243.24.0910.0334">2024.3.0</productVersion>'
+                f"<restApiVersion>{REST_API_VERSION}</restApiVersion></serverInfo>"
+            ), {}
+        if route == "/auth/signin" and method == "POST":
+            credentials = ElementTree.fromstring(body).find("credentials")
+            secret = credentials.get("personalAccessTokenSecret") or credentials.get("password")
+            if not secret or secret == "invalid":
+                raise StubError(401, "401001", "Signin Error", "Error signing in to Tableau Server")
+            token = secrets.token_hex(16)
+            site.tokens[token] = time.monotonic() + self.token_ttl if self.token_ttl else None
+            content_url = credentials.find("site").get("contentUrl", "")
+            user = site.listings["users"][0]["attrs"]["id"]
+            return 200, response(
+                f'<credentials token="{token}"><site id="{site.site_id}" contentUrl={quoteattr(content_url)}/>'
+                f'<user id="{user}"/></credentials>'
+            ), {}
+        if route == "/auth/signout" and method == "POST":
+            site.tokens.pop(self.headers.get("X-Tableau-Auth"), None)
+            return 204, b"", {}
+
+        self._authenticate()
+        if route == "/schedules" and method == "POST":
+            request = ElementTree.fromstring(body).find("schedule")
+            request.set("id", str(uuid.uuid4()))
+            request.set("state", "Active")
+            request.set("createdAt", _now())
+            return 201, response(ElementTree.tostring(request, encoding="unicode")), {}
+
+        match = re.fullmatch(r"/sites/[^/]+/(\w+)(?:/([^/]+))?(?:/(\w+))?", route)
+        if not match or match.group(1) not in TAGS:
+            raise StubError(404, "404000", "Resource Not Found", f"No stub route for {method} {route}")
+        kind, item_id, action = match.groups()
+
+        if method == "GET" and item_id is None:
+            page_number = int(query.get("pageNumber", 1))
+            page_size = int(query.get("pageSize", 100))
+            if page_size > self.max_page_size:
+                raise StubError(400, "400006", "Bad Request", f"Page size must be at most {self.max_page_size}")
+            items, total = site.page(kind, page_number, page_size, query.get("filter"))
+            return 200, response(
+                f'<pagination pageNumber="{page_number}" pageSize="{page_size}" totalAvailable="{total}"/>'
+                f"<{kind}>{''.join(render(item) for item in items)}</{kind}>"
+            ), {}
+        if method == "GET" and action is None:
+            return 200, response(render(site.get(kind, item_id))), {}
+        if method == "GET" and kind == "workbooks" and action == "connections":
+            return 200, response(f"<connections>{self._connections(site.get(kind, item_id))}</connections>"), {}
+        if method == "GET" and kind == "workbooks" and action == "content":
+            workbook = site.get(kind, item_id)
+            content = BytesIO()
+            with zipfile.ZipFile(content, "w") as archive:
+                archive.writestr(f"{workbook['attrs']['contentUrl']}.twb", "<workbook/>")
+            return 200, content.getvalue(), {
+                "Content-Type": "application/octet-stream",
+                "Content-Disposition": f'name="tableau_workbook"; filename="{workbook["attrs"]["contentUrl"]}.twbx"',
+            }
+        if method == "POST" and action == "refresh" and kind in ("workbooks", "datasources"):
+            target = site.get(kind, item_id)
+            now = _now()
+            job = site.create("jobs", {"mode": "Asynchronous", "type": "RefreshExtract", "createdAt": now,
+                                       "startedAt": now, "completedAt": now, "progress": 100, "finishCode": 0},
+                              [(TAGS[kind], {"id": target["attrs"]["id"]})])
+            return 202, response(render(job)), {}
+        if method == "POST" and kind == "groups" and action == "users":
+            group = site.get(kind, item_id)
+            user = site.get("users", ElementTree.fromstring(body).find("user").get("id"))
+            membership = (group["attrs"]["id"], user["attrs"]["id"])
+            if membership in site.memberships:
+                raise StubError(409, "409011", "Conflict", "The user is already a member of the group.")
+            site.memberships.add(membership)
+            return 200, response(render(user)), {}
+        if method == "POST" and item_id is None:
+            return self._create(kind, query, body)
+        raise StubError(404, "404000", "Resource Not Found", f"No stub route for {method} {route}")
+
+    def _connections(self, workbook):
+        datasources = self.site.listings["datasources"]
+        number = int(workbook["attrs"]["id"][-12:], 16)
+        connected = [datasources[(number + offset) % len(datasources)] for offset in range(1 + number % 2)]
+        return "".join(
+            f'<connection id="{uuid.UUID(int=number << 8 | offset)}" type="sqlserver" '
+            f'serverAddress="db{offset}.example.com" userName="reader">'
+            f'<datasource id="{datasource["attrs"]["id"]}" name={quoteattr(datasource["attrs"]["name"])}/></connection>'
+            for offset, datasource in enumerate(connected)
+        )
+
+    def _create(self, kind, query, body):
+        site = self.site
+        if kind in ("workbooks", "datasources", "flows"):
+            # Publish: multipart/mixed with the XML request payload followed by the file
+            payload = re.search(rb"<tsRequest>.*?</tsRequest>", body, re.DOTALL)
+            request = ElementTree.fromstring(payload.group(0)).find(TAGS[kind])
+            project_id = request.find("project").get("id")
+            project = site.get("projects", project_id)
+            existing = site.find(kind, request.get("name"), project_id)
+            if existing is not None and query.get("overwrite") != "true":
+                raise StubError(409, "409006", "Resource Conflict", f"A {TAGS[kind]} with that name already exists")
+            now = _now()
+            attrs = {"name": request.get("name"), "contentUrl": re.sub(r"\W", "", request.get("name")),
+                     "size": 1, "createdAt": now, "updatedAt": now}
+            children = [("project", {"id": project_id, "name": project["attrs"]["name"]}),
+                        ("owner", {"id": site.listings["users"][0]["attrs"]["id"]})]
+            if existing is not None:
+                existing["attrs"]["updatedAt"] = now
+                return 201, response(render(existing)), {}
+            return 201, response(render(site.create(kind, attrs, children))), {}
+
+        request = ElementTree.fromstring(body).find(TAGS[kind])
+        if request is None or kind not in ("projects", "groups", "users"):
+            raise StubError(400, "400000", "Bad Request", f"Cannot create {kind} with the stub")
+        conflicts = {"projects": "409006", "groups": "409009", "users": "409017"}
+        if site.find(kind, request.get("name")) is not None:
+            raise StubError(409, conflicts[kind], "Resource Conflict", f"A {TAGS[kind]} with that name already exists")
+        attrs = {key: value for key, value in request.attrib.items()}
+        children = [("domain", {"name": "local"})] if kind == "groups" else []
+        return 201, response(render(site.create(kind, attrs, children))), {}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_stub_server(port=0, items=1000, latency=0.0, max_page_size=MAX_PAGE_SIZE, rate_limit_every=0,
+                     retry_after=1, token_ttl=None):
+    """Build a threaded Tableau REST stub; port 0 picks a free port.
+
+    items: total content on the site, split across listings by SITE_SHARES
+    latency: seconds slept per request
+    rate_limit_every: answer every Nth request with 429 Too Many Requests (0 = never)
+    token_ttl: seconds before a sign-in token stops working (None = never)
+    """
+    handler = type("StubHandler", (TableauStubHandler,), {
+        "site": TableauSite(items),
+        "latency": latency,
+        "max_page_size": max_page_size,
+        "rate_limit_every": rate_limit_every,
+        "retry_after": retry_after,
+        "token_ttl": token_ttl,
+        "calls": Counter(),
+        "rate_limited": 0,
+        "requests_served": 0,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def start_stub_server(port=0, **options):
+    """Run the stub in a daemon thread and return (server, server_url)"""
+    server = make_stub_server(port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Tableau REST API stand-in")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--items", type=int, default=1000, help="total items on the site")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to sleep per request")
+    parser.add_argument("--max-page-size", type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-ttl", type=float, default=None, help="seconds a sign-in token stays valid")
+    args = parser.parse_args()
+
+    server = make_stub_server(args.port, args.items, args.latency, args.max_page_size, args.rate_limit_every,
+                              args.retry_after, args.token_ttl)
+    print(f"Serving Tableau stub on http://127.0.0.1:{args.port} ({args.items:,} items)")
+    print("Sign in with any PAT name/secret (the secret 'invalid' is refused) and that URL as the server URL")
+    server.serve_forever()